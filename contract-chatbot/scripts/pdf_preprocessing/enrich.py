@@ -1,15 +1,103 @@
 """
 Enrichment module for adding domain-specific metadata to contract sections
 """
+import re
 import logging
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
 from utils import (
     categorize_section, determine_importance, 
-    find_glossary_terms, determine_affects
+    find_glossary_terms, determine_affects, available_workers
 )
+from config import PARALLEL_ENRICHMENT_MIN_SECTIONS
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# Industry-specific keywords to look for
+_AVIATION_KEYWORDS = [
+    "flight", "aircraft", "passenger", "crew", "captain", "pilot",
+    "departure", "arrival", "gate", "terminal", "boarding", "safety",
+    "emergency", "evacuation", "turbulence", "weather", "delay",
+    "maintenance", "inspection", "training", "recertification"
+]
+
+_LABOR_KEYWORDS = [
+    "union", "grievance", "arbitration", "discipline", "termination",
+    "seniority", "probation", "evaluation", "performance", "review",
+    "contract", "agreement", "negotiation", "ratification", "vote"
+]
+
+_SCHEDULE_KEYWORDS = [
+    "schedule", "roster", "assignment", "bid", "award", "trade",
+    "pickup", "drop", "swap", "rotation", "sequence", "pairing",
+    "minimum", "maximum", "consecutive", "days off", "weekend"
+]
+
+_SEARCH_KEYWORDS = frozenset(_AVIATION_KEYWORDS + _LABOR_KEYWORDS + _SCHEDULE_KEYWORDS)
+
+
+def _build_keyword_automaton():
+    """Build one automaton that finds every search keyword in a single pass"""
+    automaton = ahocorasick.Automaton()
+    for keyword in _SEARCH_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+_CAPS_RE = re.compile(r'\b[A-Z]{2,}\b')  # All caps words
+
+# Deadline/date mentions, matched against lowercased content
+_DATE_RE = re.compile("|".join([
+    r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',  # MM/DD/YYYY
+    r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',  # MM-DD-YYYY
+    r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},?\s+\d{2,4}\b',
+    r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\.?\s+\d{1,2},?\s+\d{2,4}\b',
+    r'\b\d{1,2}\s+(?:days?|weeks?|months?|years?)\b',
+    r'\bwithin\s+\d+\s+(?:days?|weeks?|months?|years?)\b',
+    r'\b(?:deadline|due date|expiration|expires|effective)\b'
+]))
+
+# Every date pattern needs a digit or one of these words
+_DATE_WORDS = ("deadline", "due date", "expir", "effective")
+
+# Monetary/compensation mentions, matched against lowercased content
+_MONEY_RE = re.compile("|".join([
+    r'\$\d+(?:,\d{3})*(?:\.\d{2})?',  # Dollar amounts
+    r'\b\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:dollars?|cents?)\b',
+    r'\b(?:salary|wage|pay|compensation|bonus|premium|allowance|per diem|expense)\b',
+    r'\b(?:hourly|annual|monthly|weekly|daily)\s+(?:rate|pay|wage)\b',
+    r'\b\d+(?:\.\d+)?\s*(?:percent|%)\b'  # Percentages
+]))
+
+# Every monetary pattern needs a digit, a dollar sign or one of these words
+_MONEY_WORDS = ("salary", "wage", "pay", "compensation", "bonus", "premium",
+                "allowance", "per diem", "expense", "rate")
+
+# Cheap scan run before the date and money alternations
+_DIGIT_OR_DOLLAR_RE = re.compile(r'[\d$]')
+
+# Section references; "see/refer to/pursuant to section X" needs no pattern of
+# its own since the bare keyword pattern already captures the same X
+_SECTION_REF_RE = re.compile(r'(?:section|article|paragraph|appendix)\s+([A-Z0-9]+(?:\.[A-Z0-9]+)*)', re.IGNORECASE)
+
+# Heading levels, anchored at the start of the content
+_ARTICLE_HEADING_RE = re.compile(r'^\s*ARTICLE\s+\d+', re.IGNORECASE)
+_SECTION_HEADING_RE = re.compile(r'^\s*SECTION\s+\d+', re.IGNORECASE)
+_SUBSECTION_HEADING_RE = re.compile(r'^\s*\d+\.\d+')
+
+# List markers, checked at the start of every line
+_NUMBERED_LIST_RE = re.compile(r'^\s*\d+\.', re.MULTILINE)
+_LETTERED_LIST_RE = re.compile(r'^\s*[a-zA-Z]\.', re.MULTILINE)
+_BULLETED_LIST_RE = re.compile(r'^\s*[•\-\*]', re.MULTILINE)
+
 
 class DocumentEnricher:
     """Adds aviation and flight attendant specific metadata to document sections"""
@@ -21,71 +109,94 @@ class DocumentEnricher:
         """
         Enrich document sections with domain-specific metadata
         
+        Sections are updated in place rather than copied, so the returned
+        document is the one passed in.
+        
         Args:
             document: Structured document from structure.py
             
         Returns:
-            Enhanced document with enriched metadata
+            The same document with enriched metadata
         """
         if "sections" not in document:
             logger.warning(f"Document {document.get('id', 'unknown')} has no sections to enrich")
             return document
         
-        enriched_sections = []
-        
-        for section in document["sections"]:
-            enriched_section = self._enrich_section(section)
-            enriched_sections.append(enriched_section)
+        sections = document["sections"]
+        workers = min(available_workers(), len(sections))
         
-        # Update document with enriched sections
-        enriched_document = document.copy()
-        enriched_document["sections"] = enriched_sections
+        # Small documents are cheaper to enrich inline than to ship to workers
+        if workers > 1 and len(sections) >= PARALLEL_ENRICHMENT_MIN_SECTIONS:
+            self._enrich_sections_parallel(sections, workers)
+        else:
+            for section in sections:
+                self._enrich_section(section)
         
-        logger.info(f"Enriched {len(enriched_sections)} sections for document {document.get('id', 'unknown')}")
-        return enriched_document
+        logger.info(f"Enriched {len(sections)} sections for document {document.get('id', 'unknown')}")
+        return document
+    
+    def _enrich_sections_parallel(self, sections: List[Dict[str, Any]], workers: int) -> None:
+        """Enrich sections with batches split across worker processes"""
+        # Large batches keep pickling overhead small next to the per-section work
+        chunk_size = -(-len(sections) // (workers * 4))  # Ceiling division
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Workers enrich pickled copies; map() keeps submission order
+                enriched_sections = list(executor.map(self._enrich_section, sections,
+                                                      chunksize=chunk_size))
+                
+        except Exception as e:
+            logger.warning(f"Parallel enrichment failed: {e}, enriching sequentially")
+            for section in sections:
+                self._enrich_section(section)
+            return
+        
+        # Copy the results back onto the caller's section dicts
+        for section, enriched_section in zip(sections, enriched_sections):
+            section.update(enriched_section)
     
     def _enrich_section(self, section: Dict[str, Any]) -> Dict[str, Any]:
-        """Enrich a single section with metadata"""
+        """Enrich a single section with metadata in place and return it"""
         content = section.get("content", "")
         section_type = section.get("type", "paragraph")
         
-        # Create enriched section copy
-        enriched_section = section.copy()
-        
         # Ensure metadata exists
-        if "metadata" not in enriched_section:
-            enriched_section["metadata"] = {}
+        if "metadata" not in section:
+            section["metadata"] = {}
         
-        metadata = enriched_section["metadata"]
+        metadata = section["metadata"]
+        content_lower = content.lower()
         
         # Categorize section based on content
-        category = categorize_section(content)
+        category = categorize_section(content, content_lower)
         metadata["category"] = category
         
         # Determine importance level
-        importance = determine_importance(content)
+        importance = determine_importance(content, content_lower)
         metadata["importance"] = importance
         
         # Find glossary terms
-        glossary_terms = find_glossary_terms(content)
+        glossary_terms = find_glossary_terms(content, content_lower)
         metadata["glossaryTerms"] = glossary_terms
         
         # Determine affected groups
-        affects = determine_affects(content, category)
+        affects = determine_affects(content, category, content_lower)
         metadata["affects"] = affects
         
         # Add section-specific enhancements
-        self._add_section_specific_metadata(enriched_section, content, section_type)
+        self._add_section_specific_metadata(section, content, section_type, content_lower)
         
-        return enriched_section
+        return section
     
     def _add_section_specific_metadata(self, section: Dict[str, Any], 
-                                     content: str, section_type: str) -> None:
+                                     content: str, section_type: str,
+                                     content_lower: Optional[str] = None) -> None:
         """Add section-type specific metadata"""
         metadata = section["metadata"]
         
         # Add keywords for better searchability
-        keywords = self._extract_keywords(content)
+        keywords = self._extract_keywords(content, content_lower)
         metadata["keywords"] = keywords
         
         # Add cross-references if this section references other parts
@@ -105,89 +216,47 @@ class DocumentEnricher:
             metadata["hasTabularData"] = True
         
         # Identify time-sensitive information
-        if self._contains_deadlines_or_dates(content):
+        if self._contains_deadlines_or_dates(content, content_lower):
             metadata["containsDeadlines"] = True
         
         # Identify monetary information
-        if self._contains_monetary_info(content):
+        if self._contains_monetary_info(content, content_lower):
             metadata["containsMonetaryInfo"] = True
     
-    def _extract_keywords(self, content: str) -> List[str]:
+    def _extract_keywords(self, content: str, content_lower: Optional[str] = None) -> List[str]:
         """Extract relevant keywords from content for search enhancement"""
-        import re
-        
         # Convert to lowercase for processing
-        content_lower = content.lower()
+        if content_lower is None:
+            content_lower = content.lower()
         
-        # Industry-specific keywords to look for
-        aviation_keywords = [
-            "flight", "aircraft", "passenger", "crew", "captain", "pilot",
-            "departure", "arrival", "gate", "terminal", "boarding", "safety",
-            "emergency", "evacuation", "turbulence", "weather", "delay",
-            "maintenance", "inspection", "training", "recertification"
-        ]
-        
-        labor_keywords = [
-            "union", "grievance", "arbitration", "discipline", "termination",
-            "seniority", "probation", "evaluation", "performance", "review",
-            "contract", "agreement", "negotiation", "ratification", "vote"
-        ]
-        
-        schedule_keywords = [
-            "schedule", "roster", "assignment", "bid", "award", "trade",
-            "pickup", "drop", "swap", "rotation", "sequence", "pairing",
-            "minimum", "maximum", "consecutive", "days off", "weekend"
-        ]
-        
-        all_keywords = aviation_keywords + labor_keywords + schedule_keywords
-        found_keywords = []
-        
-        for keyword in all_keywords:
-            if keyword in content_lower:
-                found_keywords.append(keyword)
+        if _KEYWORD_AUTOMATON is not None:
+            found_keywords = {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(content_lower)}
+        else:
+            found_keywords = {keyword for keyword in _SEARCH_KEYWORDS if keyword in content_lower}
         
         # Also look for capitalized terms that might be important
-        caps_pattern = r'\b[A-Z]{2,}\b'  # All caps words
-        caps_matches = re.findall(caps_pattern, content)
-        found_keywords.extend(caps_matches)
+        found_keywords.update(_CAPS_RE.findall(content))
         
-        # Remove duplicates and return
-        return list(set(found_keywords))
+        # The set already removed duplicates; sort for stable output
+        return sorted(found_keywords)
     
     def _find_cross_references(self, content: str) -> List[str]:
         """Find references to other sections or documents"""
-        import re
-        
-        cross_refs = []
-        
-        # Look for section references
-        section_patterns = [
-            r'(?:section|article|paragraph|appendix)\s+([A-Z0-9]+(?:\.[A-Z0-9]+)*)',
-            r'(?:see|refer to|pursuant to)\s+(?:section|article|paragraph)\s+([A-Z0-9]+(?:\.[A-Z0-9]+)*)',
-            r'\b([A-Z0-9]+(?:\.[A-Z0-9]+){1,3})\b'  # Pattern like 12.3.4
-        ]
-        
-        for pattern in section_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            cross_refs.extend(matches)
-        
-        # Remove duplicates
-        return list(set(cross_refs))
+        # Remove duplicates, keeping the order references appear in
+        return list(dict.fromkeys(_SECTION_REF_RE.findall(content)))
     
     def _determine_heading_level(self, content: str) -> int:
         """Determine heading level based on content"""
-        import re
-        
         # Article level (highest)
-        if re.search(r'^\s*ARTICLE\s+\d+', content, re.IGNORECASE):
+        if _ARTICLE_HEADING_RE.search(content):
             return 1
         
         # Section level
-        if re.search(r'^\s*SECTION\s+\d+', content, re.IGNORECASE):
+        if _SECTION_HEADING_RE.search(content):
             return 2
         
         # Subsection level
-        if re.search(r'^\s*\d+\.\d+', content):
+        if _SUBSECTION_HEADING_RE.search(content):
             return 3
         
         # Default heading level
@@ -195,58 +264,38 @@ class DocumentEnricher:
     
     def _determine_list_type(self, content: str) -> str:
         """Determine the type of list"""
-        import re
-        
-        if re.search(r'^\s*\d+\.', content, re.MULTILINE):
+        if _NUMBERED_LIST_RE.search(content):
             return "numbered"
-        elif re.search(r'^\s*[a-zA-Z]\.', content, re.MULTILINE):
+        elif _LETTERED_LIST_RE.search(content):
             return "lettered"
-        elif re.search(r'^\s*[•\-\*]', content, re.MULTILINE):
+        elif _BULLETED_LIST_RE.search(content):
             return "bulleted"
         else:
             return "unformatted"
     
-    def _contains_deadlines_or_dates(self, content: str) -> bool:
+    def _contains_deadlines_or_dates(self, content: str, content_lower: Optional[str] = None) -> bool:
         """Check if content contains deadline or date information"""
-        import re
-        
-        date_patterns = [
-            r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',  # MM/DD/YYYY
-            r'\b\d{1,2}-\d{1,2}-\d{2,4}\b',  # MM-DD-YYYY
-            r'\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},?\s+\d{2,4}\b',
-            r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\.?\s+\d{1,2},?\s+\d{2,4}\b',
-            r'\b\d{1,2}\s+(?:days?|weeks?|months?|years?)\b',
-            r'\bwithin\s+\d+\s+(?:days?|weeks?|months?|years?)\b',
-            r'\b(?:deadline|due date|expiration|expires|effective)\b'
-        ]
+        if content_lower is None:
+            content_lower = content.lower()
         
-        content_lower = content.lower()
+        # Skip the full alternation when no pattern can possibly match
+        if not _DIGIT_OR_DOLLAR_RE.search(content_lower) and \
+                not any(word in content_lower for word in _DATE_WORDS):
+            return False
         
-        for pattern in date_patterns:
-            if re.search(pattern, content_lower):
-                return True
-        
-        return False
+        return _DATE_RE.search(content_lower) is not None
     
-    def _contains_monetary_info(self, content: str) -> bool:
+    def _contains_monetary_info(self, content: str, content_lower: Optional[str] = None) -> bool:
         """Check if content contains monetary or compensation information"""
-        import re
-        
-        money_patterns = [
-            r'\$\d+(?:,\d{3})*(?:\.\d{2})?',  # Dollar amounts
-            r'\b\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:dollars?|cents?)\b',
-            r'\b(?:salary|wage|pay|compensation|bonus|premium|allowance|per diem|expense)\b',
-            r'\b(?:hourly|annual|monthly|weekly|daily)\s+(?:rate|pay|wage)\b',
-            r'\b\d+(?:\.\d+)?\s*(?:percent|%)\b'  # Percentages
-        ]
-        
-        content_lower = content.lower()
+        if content_lower is None:
+            content_lower = content.lower()
         
-        for pattern in money_patterns:
-            if re.search(pattern, content_lower):
-                return True
+        # Skip the full alternation when no pattern can possibly match
+        if not _DIGIT_OR_DOLLAR_RE.search(content_lower) and \
+                not any(word in content_lower for word in _MONEY_WORDS):
+            return False
         
-        return False
+        return _MONEY_RE.search(content_lower) is not None
 
 
 def enrich_document_content(document: Dict[str, Any]) -> Dict[str, Any]:
@@ -3,8 +3,12 @@ PDF extraction module for contract preprocessing
 """
 import fitz  # PyMuPDF
 import logging
+from sys import intern
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Tuple, Optional
-from utils import clean_text
+from utils import clean_text, available_workers
+from utils_layout import TEXT_DICT_FLAGS
+from config import PARALLEL_EXTRACTION_MIN_PAGES
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,14 +25,105 @@ class TextBlock:
         self.bbox = bbox  # (x0, y0, x1, y1)
 
 
+# Block text shorter than this is interned
+INTERN_MAX_LENGTH = 64
+
+# Pickle-friendly (content, font_size, page_num, bbox) record passed back from workers
+BlockRecord = Tuple[str, float, int, Tuple[float, float, float, float]]
+
+
+def _extract_page_records(page, page_num: int) -> List[BlockRecord]:
+    """Extract text block records from a single page"""
+    records = []
+    append_record = records.append
+    clean = clean_text
+    
+    try:
+        # Get text blocks with font information
+        text_dict = page.get_text("dict", flags=TEXT_DICT_FLAGS)
+        
+        for block in text_dict["blocks"]:
+            if "lines" not in block:  # Not a text block
+                continue
+            
+            block_content = []
+            # Running total instead of a per-block list of font sizes
+            size_sum = 0.0
+            size_count = 0
+            
+            for line in block["lines"]:
+                line_text = ""
+                for span in line["spans"]:
+                    span_text = span.get("text", "")
+                    if span_text.strip():
+                        line_text += span_text
+                        size_sum += span.get("size", 10)
+                        size_count += 1
+                
+                line_text = line_text.strip()
+                if line_text:
+                    block_content.append(line_text)
+            
+            if block_content and size_count:
+                content = clean(" ".join(block_content))
+                
+                if content:  # Only add non-empty content
+                    # Short repeated lines (headers, footers) share one string object
+                    if len(content) < INTERN_MAX_LENGTH:
+                        content = intern(content)
+                    x0, y0, x1, y1 = block["bbox"][:4]
+                    append_record((content, size_sum / size_count, page_num, (x0, y0, x1, y1)))
+    
+    except Exception as e:
+        logger.warning(f"Error extracting from page {page_num}: {e}")
+        # Fallback to simple text extraction
+        try:
+            simple_text = page.get_text()
+            if simple_text.strip():
+                content = clean_text(simple_text)
+                # Default font size and bbox
+                records.append((content, 10.0, page_num, (0, 0, 0, 0)))
+        except Exception as fallback_error:
+            logger.error(f"Fallback extraction failed for page {page_num}: {fallback_error}")
+    
+    return records
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[BlockRecord]:
+    """
+    Extract block records from pages [start, end) in a worker process.
+    
+    PyMuPDF pages cannot be pickled, so each worker opens its own document.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        records = []
+        for page_num in range(start, end):
+            records.extend(_extract_page_records(doc[page_num], page_num + 1))
+        return records
+    finally:
+        doc.close()
+
+
 class PDFExtractor:
     """Main PDF extraction class using PyMuPDF"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: Optional[str] = None, doc: Optional[fitz.Document] = None):
+        """
+        Args:
+            pdf_path: Path to the PDF file
+            doc: Optional already-open document to reuse instead of opening pdf_path;
+                 the caller stays responsible for closing it
+        """
         self.pdf_path = pdf_path
-        self.doc = None
+        self.doc = doc
+        self._owns_doc = doc is None
+        self._metadata_cache = None
         
     def __enter__(self):
+        if not self._owns_doc:
+            return self
+        
         try:
             self.doc = fitz.open(self.pdf_path)
             logger.info(f"Opened PDF: {self.pdf_path} ({self.doc.page_count} pages)")
@@ -38,101 +133,74 @@ class PDFExtractor:
             raise
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.doc:
+        self._metadata_cache = None
+        if self.doc and self._owns_doc:
             self.doc.close()
     
     def extract_text_blocks(self) -> List[TextBlock]:
         """Extract text blocks with metadata from all pages"""
-        text_blocks = []
-        
         if not self.doc:
             raise ValueError("PDF document not opened")
         
-        for page_num in range(self.doc.page_count):
-            page = self.doc[page_num]
-            page_blocks = self._extract_page_blocks(page, page_num + 1)
-            text_blocks.extend(page_blocks)
+        page_count = self.doc.page_count
+        workers = min(available_workers(), page_count)
+        
+        # Workers reopen the file, so a borrowed document without a path stays sequential
+        if self.pdf_path and workers > 1 and page_count >= PARALLEL_EXTRACTION_MIN_PAGES:
+            records = self._extract_records_parallel(page_count, workers)
+        else:
+            records = []
+            for page_num in range(page_count):
+                records.extend(_extract_page_records(self.doc[page_num], page_num + 1))
+        
+        text_blocks = [TextBlock(*record) for record in records]
             
         logger.info(f"Extracted {len(text_blocks)} text blocks")
         return text_blocks
     
-    def _extract_page_blocks(self, page, page_num: int) -> List[TextBlock]:
-        """Extract text blocks from a single page"""
-        blocks = []
+    def _extract_records_parallel(self, page_count: int, workers: int) -> List[BlockRecord]:
+        """Extract block records with pages split across worker processes"""
+        chunk_size = -(-page_count // workers)  # Ceiling division
+        page_ranges = [(start, min(start + chunk_size, page_count))
+                       for start in range(0, page_count, chunk_size)]
         
         try:
-            # Get text blocks with font information
-            text_dict = page.get_text("dict")
-            
-            for block in text_dict["blocks"]:
-                if "lines" in block:  # Text block
-                    block_content = []
-                    avg_font_size = 0
-                    font_sizes = []
-                    
-                    for line in block["lines"]:
-                        line_text = ""
-                        for span in line["spans"]:
-                            span_text = span.get("text", "")
-                            if span_text.strip():
-                                line_text += span_text
-                                font_sizes.append(span.get("size", 10))
-                        
-                        if line_text.strip():
-                            block_content.append(line_text.strip())
-                    
-                    if block_content and font_sizes:
-                        content = " ".join(block_content)
-                        content = clean_text(content)
-                        
-                        if content:  # Only add non-empty content
-                            avg_font_size = sum(font_sizes) / len(font_sizes)
-                            bbox = (block["bbox"][0], block["bbox"][1], 
-                                   block["bbox"][2], block["bbox"][3])
-                            
-                            text_block = TextBlock(
-                                content=content,
-                                font_size=avg_font_size,
-                                page_num=page_num,
-                                bbox=bbox
-                            )
-                            blocks.append(text_block)
-        
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_extract_page_range, self.pdf_path, start, end)
+                           for start, end in page_ranges]
+                
+                # Collect in submission order to keep blocks in page order
+                records = []
+                for future in futures:
+                    records.extend(future.result())
+                return records
+                
         except Exception as e:
-            logger.warning(f"Error extracting from page {page_num}: {e}")
-            # Fallback to simple text extraction
-            try:
-                simple_text = page.get_text()
-                if simple_text.strip():
-                    content = clean_text(simple_text)
-                    text_block = TextBlock(
-                        content=content,
-                        font_size=10.0,  # Default font size
-                        page_num=page_num,
-                        bbox=(0, 0, 0, 0)  # Default bbox
-                    )
-                    blocks.append(text_block)
-            except Exception as fallback_error:
-                logger.error(f"Fallback extraction failed for page {page_num}: {fallback_error}")
-        
-        return blocks
+            logger.warning(f"Parallel extraction failed: {e}, extracting sequentially")
+            records = []
+            for page_num in range(page_count):
+                records.extend(_extract_page_records(self.doc[page_num], page_num + 1))
+            return records
     
     def get_document_metadata(self) -> Dict[str, Any]:
         """Extract document metadata"""
         if not self.doc:
             return {}
         
-        metadata = self.doc.metadata
-        return {
-            "title": metadata.get("title", ""),
-            "author": metadata.get("author", ""),
-            "subject": metadata.get("subject", ""),
-            "creator": metadata.get("creator", ""),
-            "producer": metadata.get("producer", ""),
-            "creation_date": metadata.get("creationDate", ""),
-            "modification_date": metadata.get("modDate", ""),
-            "page_count": self.doc.page_count
-        }
+        # Build once; repeated calls reuse the cached dict
+        if self._metadata_cache is None:
+            metadata = self.doc.metadata
+            self._metadata_cache = {
+                "title": metadata.get("title", ""),
+                "author": metadata.get("author", ""),
+                "subject": metadata.get("subject", ""),
+                "creator": metadata.get("creator", ""),
+                "producer": metadata.get("producer", ""),
+                "creation_date": metadata.get("creationDate", ""),
+                "modification_date": metadata.get("modDate", ""),
+                "page_count": self.doc.page_count
+            }
+        return self._metadata_cache
 
 
 class PDFExtractorFallback:
@@ -144,9 +212,8 @@ class PDFExtractorFallback:
     def extract_text_blocks(self) -> List[TextBlock]:
         """Extract text using pdfminer.six as fallback"""
         try:
-            from pdfminer.high_level import extract_text_to_fp
-            from pdfminer.layout import LAParams
-            import io
+            from pdfminer.high_level import extract_pages
+            from pdfminer.layout import LAParams, LTTextBox
             
             logger.info(f"Using fallback extractor for {self.pdf_path}")
             
@@ -157,28 +224,25 @@ class PDFExtractorFallback:
                 boxes_flow=0.5
             )
             
-            output_string = io.StringIO()
-            
-            with open(self.pdf_path, 'rb') as fp:
-                extract_text_to_fp(fp, output_string, laparams=laparams)
-            
-            text = output_string.getvalue()
-            text = clean_text(text)
+            # Walk the layout tree directly so each text box keeps its own
+            # page number and bbox (pdfminer coordinates: origin bottom-left)
+            blocks = []
+            for page_num, page_layout in enumerate(extract_pages(self.pdf_path, laparams=laparams), 1):
+                for element in page_layout:
+                    if not isinstance(element, LTTextBox):
+                        continue
+                    
+                    content = clean_text(element.get_text())
+                    if content:
+                        text_block = TextBlock(
+                            content=content,
+                            font_size=10.0,  # Default font size
+                            page_num=page_num,
+                            bbox=tuple(element.bbox)
+                        )
+                        blocks.append(text_block)
             
-            if text:
-                # Split into paragraphs and create text blocks
-                paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-                blocks = []
-                
-                for i, paragraph in enumerate(paragraphs):
-                    text_block = TextBlock(
-                        content=paragraph,
-                        font_size=10.0,  # Default font size
-                        page_num=1,  # Default page number
-                        bbox=(0, 0, 0, 0)  # Default bbox
-                    )
-                    blocks.append(text_block)
-                
+            if blocks:
                 logger.info(f"Fallback extractor created {len(blocks)} text blocks")
                 return blocks
             
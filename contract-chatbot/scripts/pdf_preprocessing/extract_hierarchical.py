@@ -6,7 +6,7 @@ import fitz  # PyMuPDF
 import logging
 from typing import List, Dict, Any, Tuple, Optional
 from utils import clean_text
-from utils_layout import extract_page_text_blocks
+from utils_layout import iter_document_text_blocks
 from hierarchical_parser import HierarchicalParser
 from hierarchical_json import convert_hierarchy_to_document_json, flatten_hierarchy_for_compatibility
 
@@ -21,6 +21,7 @@ class HierarchicalPDFExtractor:
     def __init__(self, pdf_path: str, use_hierarchical: bool = True):
         self.pdf_path = pdf_path
         self.doc = None
+        self._metadata_cache = None
         self.use_hierarchical = use_hierarchical
         
     def __enter__(self):
@@ -33,16 +34,19 @@ class HierarchicalPDFExtractor:
             raise
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self._metadata_cache = None
         if self.doc:
             self.doc.close()
     
-    def extract_hierarchical_content(self, doc_id: str, title: str = "") -> Dict[str, Any]:
+    def extract_hierarchical_content(self, doc_id: str, title: str = "",
+                                     max_sections: Optional[int] = None) -> Dict[str, Any]:
         """
         Extract content with hierarchical parsing and return structured JSON
         
         Args:
             doc_id: Document identifier
             title: Document title
+            max_sections: Optional cap on flattened sections (None for all)
             
         Returns:
             Structured document JSON
@@ -52,17 +56,12 @@ class HierarchicalPDFExtractor:
         
         logger.info(f"Starting hierarchical extraction for {doc_id}")
         
-        # Step 1: Extract detailed text blocks from all pages
-        all_pages_blocks = []
-        for page_num in range(self.doc.page_count):
-            page = self.doc[page_num]
-            page_blocks = extract_page_text_blocks(page, page_num + 1)
-            all_pages_blocks.append(page_blocks)
-            logger.debug(f"Extracted {len(page_blocks)} blocks from page {page_num + 1}")
-        
-        # Step 2: Parse hierarchical structure
+        # Steps 1-2: Extract each page and feed it straight into the parser,
+        # so page blocks are never collected for the whole document first
         parser = HierarchicalParser()
-        hierarchy_nodes = parser.parse_document(all_pages_blocks, title)
+        for page_blocks in iter_document_text_blocks(self.doc, self.pdf_path):
+            parser.feed(page_blocks)
+        hierarchy_nodes = parser.finalize()
         
         # Step 3: Get document metadata
         metadata = self.get_document_metadata()
@@ -73,7 +72,7 @@ class HierarchicalPDFExtractor:
         )
         
         # Step 5: Flatten for compatibility with existing app
-        flattened_json = flatten_hierarchy_for_compatibility(document_json)
+        flattened_json = flatten_hierarchy_for_compatibility(document_json, max_sections)
         
         logger.info(f"Successfully processed {doc_id} with hierarchical parsing")
         return flattened_json
@@ -89,8 +88,8 @@ class HierarchicalPDFExtractor:
         
         logger.info("Using legacy extraction method")
         
-        # Use the original extraction logic
-        with PDFExtractor(self.pdf_path) as extractor:
+        # Use the original extraction logic on the already-open document
+        with PDFExtractor(self.pdf_path, doc=self.doc) as extractor:
             text_blocks = extractor.extract_text_blocks()
             metadata = extractor.get_document_metadata()
             
@@ -101,22 +100,26 @@ class HierarchicalPDFExtractor:
         if not self.doc:
             return {}
         
-        metadata = self.doc.metadata
-        return {
-            "title": metadata.get("title", ""),
-            "author": metadata.get("author", ""),
-            "subject": metadata.get("subject", ""),
-            "creator": metadata.get("creator", ""),
-            "producer": metadata.get("producer", ""),
-            "creation_date": metadata.get("creationDate", ""),
-            "modification_date": metadata.get("modDate", ""),
-            "page_count": self.doc.page_count,
-            "extraction_method": "hierarchical_enhanced"
-        }
+        # Build once; repeated calls reuse the cached dict
+        if self._metadata_cache is None:
+            metadata = self.doc.metadata
+            self._metadata_cache = {
+                "title": metadata.get("title", ""),
+                "author": metadata.get("author", ""),
+                "subject": metadata.get("subject", ""),
+                "creator": metadata.get("creator", ""),
+                "producer": metadata.get("producer", ""),
+                "creation_date": metadata.get("creationDate", ""),
+                "modification_date": metadata.get("modDate", ""),
+                "page_count": self.doc.page_count,
+                "extraction_method": "hierarchical_enhanced"
+            }
+        return self._metadata_cache
 
 
 def extract_pdf_content_hierarchical(pdf_path: str, doc_id: str, title: str = "", 
-                                   use_hierarchical: bool = True) -> Dict[str, Any]:
+                                   use_hierarchical: bool = True,
+                                   max_sections: Optional[int] = None) -> Dict[str, Any]:
     """
     Extract PDF content with optional hierarchical parsing
     
@@ -125,6 +128,8 @@ def extract_pdf_content_hierarchical(pdf_path: str, doc_id: str, title: str = ""
         doc_id: Document identifier
         title: Document title
         use_hierarchical: Whether to use hierarchical parsing
+        max_sections: Optional cap on flattened sections from hierarchical
+                      parsing (None for all)
         
     Returns:
         Structured document JSON
@@ -132,7 +137,7 @@ def extract_pdf_content_hierarchical(pdf_path: str, doc_id: str, title: str = ""
     try:
         with HierarchicalPDFExtractor(pdf_path, use_hierarchical) as extractor:
             if use_hierarchical:
-                return extractor.extract_hierarchical_content(doc_id, title)
+                return extractor.extract_hierarchical_content(doc_id, title, max_sections)
             else:
                 # Use legacy method and convert to expected format
                 text_blocks, metadata = extractor.extract_legacy_content()
@@ -179,18 +184,26 @@ def test_hierarchical_extraction(pdf_path: str, output_path: str = None) -> None
     doc_id = "test_doc"
     title = "Test Document"
     
+    # Only the preview sections are needed unless the full output is saved
+    preview_count = 5
+    max_sections = None if output_path else preview_count
+    
     try:
         # Test hierarchical extraction
-        result = extract_pdf_content_hierarchical(pdf_path, doc_id, title, use_hierarchical=True)
+        result = extract_pdf_content_hierarchical(pdf_path, doc_id, title, use_hierarchical=True,
+                                                  max_sections=max_sections)
         
         print(f"\n=== HIERARCHICAL EXTRACTION TEST RESULTS ===")
         print(f"Document ID: {result.get('id')}")
         print(f"Title: {result.get('title')}")
-        print(f"Total sections: {len(result.get('sections', []))}")
+        if max_sections is None:
+            print(f"Total sections: {len(result.get('sections', []))}")
+        else:
+            print(f"Sections flattened for preview: {len(result.get('sections', []))}")
         
         # Print first few sections for inspection
         sections = result.get('sections', [])
-        for i, section in enumerate(sections[:5]):
+        for i, section in enumerate(sections[:preview_count]):
             print(f"\nSection {i+1}:")
             print(f"  ID: {section.get('id')}")
             print(f"  Type: {section.get('type')}")
@@ -206,8 +219,14 @@ def test_hierarchical_extraction(pdf_path: str, output_path: str = None) -> None
         
         # Save output if requested
         if output_path:
-            with open(output_path, 'w') as f:
-                json.dump(result, f, indent=2)
+            try:
+                # orjson encodes straight to bytes without building the text in Python
+                import orjson
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+            except ImportError:
+                with open(output_path, 'w') as f:
+                    json.dump(result, f, indent=2)
             print(f"\nTest output saved to: {output_path}")
         
         print(f"\n=== TEST COMPLETED SUCCESSFULLY ===")
@@ -2,39 +2,92 @@
 JSON conversion module for hierarchical document structure
 Task 4 implementation from pdf-parsing.md plan
 """
+import re
 import logging
-from typing import Dict, Any, List
+from functools import lru_cache
+from sys import intern
+from typing import Dict, Any, List, Optional
 from hierarchical_parser import HierarchyNode
 
 logger = logging.getLogger(__name__)
 
+# Node JSON schema produced by _build_json_node. Every node always has:
+#   id, type, identifier_text, title_text, content_text,
+#   page_number_start, page_number_end, children (list, possibly empty)
+# and optionally "metadata". identifier_text/title_text may be None, but the
+# keys are always present, so code in this module subscripts them directly.
+
+# Hierarchical node type -> section type understood by the app
+_SECTION_TYPE_MAPPING = {
+    "section": "heading",
+    "loa": "heading",
+    "capital_letter_item": "heading",
+    "number_item": "list",
+    "lowercase_letter_item": "list",
+    "paragraph": "paragraph"
+}
+_section_type_for = _SECTION_TYPE_MAPPING.get
+
+# Category keywords in priority order: the first category with any keyword wins
+_CATEGORY_TERMS = (
+    ("scheduling", ("schedule", "duty", "time", "hours", "shift")),
+    ("pay", ("pay", "wage", "salary", "compensation")),
+    ("benefits", ("benefit", "insurance", "vacation", "sick")),
+    ("work_rules", ("rule", "procedure", "conduct", "discipline")),
+)
+_CATEGORY_NAMES = tuple(category for category, _ in _CATEGORY_TERMS)
+
+# One group per category, wrapped in a lookahead so overlapping keywords are
+# still seen; at any position the highest-priority matching group wins
+_CATEGORY_RE = re.compile(
+    "(?=" + "|".join(
+        "(" + "|".join(re.escape(term) for term in terms) + ")"
+        for _, terms in _CATEGORY_TERMS
+    ) + ")"
+)
+
 
 def convert_node_to_json(node: HierarchyNode) -> Dict[str, Any]:
     """
     Convert a HierarchyNode to JSON dictionary structure.
     
+    Walks the subtree with an explicit stack rather than recursion, so deep
+    hierarchies don't pay for a Python frame per node.
+    
     Args:
         node: HierarchyNode to convert
         
     Returns:
         Dictionary representation following the new hierarchical JSON schema
     """
+    root_json = _build_json_node(node)
+    
+    # Each entry holds the children still to visit and the list they convert into
+    stack = [(iter(node.children), root_json["children"])]
+    while stack:
+        children, children_json = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        
+        child_json = _build_json_node(child)
+        children_json.append(child_json)
+        stack.append((iter(child.children), child_json["children"]))
+    
+    return root_json
+
+
+def _build_json_node(node: HierarchyNode) -> Dict[str, Any]:
+    """Build the JSON dictionary for a single node, with an empty children list"""
     # Aggregate content text from all text blocks
     content_text = ""
     if node.content_text_blocks:
-        content_parts = []
-        for block in node.content_text_blocks:
-            if isinstance(block, dict) and "text" in block:
-                content_parts.append(block["text"])
-            elif isinstance(block, str):
-                content_parts.append(block)
-        content_text = " ".join(content_parts).strip()
-    
-    # Convert children recursively
-    children_json = []
-    for child in node.children:
-        child_json = convert_node_to_json(child)
-        children_json.append(child_json)
+        content_text = " ".join([
+            block["text"] if isinstance(block, dict) else block
+            for block in node.content_text_blocks
+            if isinstance(block, str) or (isinstance(block, dict) and "text" in block)
+        ]).strip()
     
     # Create base JSON structure
     json_node = {
@@ -45,7 +98,7 @@ def convert_node_to_json(node: HierarchyNode) -> Dict[str, Any]:
         "content_text": content_text,
         "page_number_start": node.page_number_start,
         "page_number_end": node.page_number_end,
-        "children": children_json
+        "children": []
     }
     
     # Add metadata if available
@@ -59,18 +112,7 @@ def convert_node_to_json(node: HierarchyNode) -> Dict[str, Any]:
     
     # Add content block metadata for advanced rendering
     if node.content_text_blocks:
-        metadata["content_blocks"] = [
-            {
-                "page_number": block.get("page_number", 1),
-                "bbox": block.get("bbox", [0, 0, 0, 0]),
-                "font_size": block.get("avg_font_size", 10.0),
-                "font_name": block.get("dominant_font_name", ""),
-                "is_bold": block.get("is_bold", False),
-                "is_italic": block.get("is_italic", False)
-            }
-            for block in node.content_text_blocks
-            if isinstance(block, dict)
-        ]
+        metadata["content_blocks"] = _content_blocks_metadata(node.content_text_blocks)
     
     if metadata:
         json_node["metadata"] = metadata
@@ -78,6 +120,23 @@ def convert_node_to_json(node: HierarchyNode) -> Dict[str, Any]:
     return json_node
 
 
+def _content_blocks_metadata(blocks: List[Any]) -> List[Dict[str, Any]]:
+    """Collect per-block layout metadata for a node's content blocks"""
+    # Font names repeat across nearly every block, so they are interned
+    return [
+        {
+            "page_number": block.get("page_number", 1),
+            "bbox": block.get("bbox", [0, 0, 0, 0]),
+            "font_size": block.get("avg_font_size", 10.0),
+            "font_name": intern(block.get("dominant_font_name", "")),
+            "is_bold": block.get("is_bold", False),
+            "is_italic": block.get("is_italic", False)
+        }
+        for block in blocks
+        if isinstance(block, dict)
+    ]
+
+
 def convert_hierarchy_to_document_json(hierarchy_nodes: List[HierarchyNode], 
                                      document_id: str, 
                                      document_title: str,
@@ -122,51 +181,37 @@ def convert_hierarchy_to_document_json(hierarchy_nodes: List[HierarchyNode],
     return document_json
 
 
-def flatten_hierarchy_for_compatibility(document_json: Dict[str, Any]) -> Dict[str, Any]:
+def flatten_hierarchy_for_compatibility(document_json: Dict[str, Any],
+                                       max_sections: Optional[int] = None) -> Dict[str, Any]:
     """
     Flatten hierarchical structure for compatibility with existing app components.
     This creates a flat list of sections while preserving hierarchical information.
     
     Args:
         document_json: Hierarchical document JSON
+        max_sections: Optional cap on flattened sections; flattening stops once
+                      it is reached (None flattens everything)
         
     Returns:
         Flattened document JSON compatible with existing app
     """
     flattened_sections = []
     
-    def flatten_node(node: Dict[str, Any], level: int = 0, parent_path: str = "") -> None:
-        """Recursively flatten a node and its children"""
-        # Create section for current node
-        section = {
-            "id": node["id"],
-            "type": _map_hierarchical_type_to_section_type(node["type"]),
-            "content": _create_section_content(node),
-            "originalPage": node["page_number_start"],
-            "metadata": _create_section_metadata(node, level, parent_path)
-        }
+    # Pre-order walk with an explicit stack of (node, level, parent_path);
+    # children are pushed in reverse so they pop in document order
+    stack = [(section, 0, "") for section in reversed(document_json["sections"])]
+    while stack:
+        if max_sections is not None and len(flattened_sections) >= max_sections:
+            break
         
-        # Add hierarchical information
-        section["hierarchy"] = {
-            "level": level,
-            "type": node["type"],
-            "identifier": node["identifier_text"],
-            "title": node["title_text"],
-            "parent_path": parent_path,
-            "page_range": [node["page_number_start"], node["page_number_end"]],
-            "has_children": len(node.get("children", [])) > 0
-        }
+        node, level, parent_path = stack.pop()
+        flattened_sections.append(_flatten_node(node, level, parent_path))
         
-        flattened_sections.append(section)
-        
-        # Flatten children
-        current_path = _build_path(parent_path, node["identifier_text"], node["title_text"])
-        for child in node.get("children", []):
-            flatten_node(child, level + 1, current_path)
-    
-    # Flatten all top-level nodes
-    for section in document_json.get("sections", []):
-        flatten_node(section)
+        children = node["children"]
+        if children:
+            current_path = _build_path(parent_path, node["identifier_text"], node["title_text"])
+            for child in reversed(children):
+                stack.append((child, level + 1, current_path))
     
     # Create flattened document
     flattened_document = {
@@ -187,37 +232,52 @@ def flatten_hierarchy_for_compatibility(document_json: Dict[str, Any]) -> Dict[s
     return flattened_document
 
 
+def _flatten_node(node: Dict[str, Any], level: int, parent_path: str) -> Dict[str, Any]:
+    """Create the flat section for a single node (children are handled by the caller)"""
+    # Read each node field once
+    node_type = node["type"]
+    page_start = node["page_number_start"]
+    children = node["children"]
+    
+    return {
+        "id": node["id"],
+        "type": _map_hierarchical_type_to_section_type(node_type),
+        "content": _create_section_content(node),
+        "originalPage": page_start,
+        "metadata": _create_section_metadata(node, level, parent_path),
+        # Hierarchical information
+        "hierarchy": {
+            "level": level,
+            "type": node_type,
+            "identifier": node["identifier_text"],
+            "title": node["title_text"],
+            "parent_path": parent_path,
+            "page_range": [page_start, node["page_number_end"]],
+            "has_children": len(children) > 0
+        }
+    }
+
+
 def _map_hierarchical_type_to_section_type(hierarchical_type: str) -> str:
     """Map hierarchical types to existing section types"""
-    mapping = {
-        "section": "heading",
-        "loa": "heading", 
-        "capital_letter_item": "heading",
-        "number_item": "list",
-        "lowercase_letter_item": "list",
-        "paragraph": "paragraph"
-    }
-    return mapping.get(hierarchical_type, "paragraph")
+    return _section_type_for(hierarchical_type, "paragraph")
 
 
 def _create_section_content(node: Dict[str, Any]) -> str:
     """Create content string for section"""
-    parts = []
+    identifier = node["identifier_text"]
+    title = node["title_text"]
+    content_text = node["content_text"]
     
-    # Add title if available
-    if node.get("title_text"):
-        if node.get("identifier_text"):
-            parts.append(f"{node['identifier_text']}. {node['title_text']}")
-        else:
-            parts.append(node["title_text"])
-    elif node.get("identifier_text"):
-        parts.append(node["identifier_text"])
-    
-    # Add content text
-    if node.get("content_text"):
-        parts.append(node["content_text"])
+    # Header line: "identifier. title", or whichever of the two is present
+    if title:
+        header = f"{identifier}. {title}" if identifier else title
+    else:
+        header = identifier
     
-    return "\n".join(parts) if parts else ""
+    if header:
+        return f"{header}\n{content_text}" if content_text else header
+    return content_text or ""
 
 
 def _create_section_metadata(node: Dict[str, Any], level: int, parent_path: str) -> Dict[str, Any]:
@@ -239,20 +299,22 @@ def _create_section_metadata(node: Dict[str, Any], level: int, parent_path: str)
 
 def _determine_category(node: Dict[str, Any]) -> str:
     """Determine category based on content"""
-    content = (node.get("content_text", "") + " " + 
-              node.get("title_text", "")).lower()
+    content = (node["content_text"] + " " + (node["title_text"] or "")).lower()
+    return _category_for_text(content)
+
+
+@lru_cache(maxsize=4096)
+def _category_for_text(content: str) -> str:
+    """Categorize lowercased text; memoized since contracts repeat boilerplate clauses"""
+    # Single scan for every category keyword; keep the highest-priority hit
+    best = None
+    for match in _CATEGORY_RE.finditer(content):
+        if best is None or match.lastindex < best:
+            best = match.lastindex
+            if best == 1:
+                break
     
-    # Basic category detection - can be enhanced
-    if any(term in content for term in ["schedule", "duty", "time", "hours", "shift"]):
-        return "scheduling"
-    elif any(term in content for term in ["pay", "wage", "salary", "compensation"]):
-        return "pay"
-    elif any(term in content for term in ["benefit", "insurance", "vacation", "sick"]):
-        return "benefits"
-    elif any(term in content for term in ["rule", "procedure", "conduct", "discipline"]):
-        return "work_rules"
-    else:
-        return "general"
+    return _CATEGORY_NAMES[best - 1] if best else "general"
 
 
 def _determine_importance(node: Dict[str, Any], level: int) -> str:
@@ -3,31 +3,152 @@ Hierarchical PDF parsing engine for contract documents
 Task 3 implementation from pdf-parsing.md plan
 """
 import re
+import string
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Header patterns, compiled once, each with the (identifier, title) group pairs
+# of its alternatives
+_SECTION_PATTERN = re.compile(
+    r"(?:SECTION|ARTICLE|PART)\s+([IVXLCDM\d]+)\s*[:.]?\s*(.*)"
+    r"|([IVXLCDM]{1,4})\.\s+(.+)",  # Roman numeral with period
+    re.IGNORECASE
+)
+_SECTION_GROUPS = ((1, 2), (3, 4))
+
+_LOA_PATTERN = re.compile(
+    r"(?:LETTER\s+OF\s+AGREEMENT|LOA)\s*[#]?\s*(\d+|[IVXLCDM]+)\s*[:.]?\s*(.*)"
+    r"|APPENDIX\s+([A-Z]+|\d+)\s*[:.]?\s*(.*)",
+    re.IGNORECASE
+)
+_LOA_GROUPS = ((1, 2), (3, 4))
+
+# Item markers like "A." / "A)" or "(A)" share the title group
+_CAPITAL_LETTER_PATTERN = re.compile(r"(?:([A-Z])\s*[.)]|\(([A-Z])\))\s*(.*)")
+_NUMBER_PATTERN = re.compile(r"(?:(\d+)\s*[.)]|\((\d+)\))\s*(.*)")
+_LOWERCASE_LETTER_PATTERN = re.compile(r"(?:([a-z])\s*[.)]|\(([a-z])\))\s*(.*)")
+_ITEM_GROUPS = ((1, 3), (2, 3))
+
+# Hierarchy levels (lower number = higher level)
+_LEVEL_BY_TYPE = {
+    "section": 1,
+    "loa": 1,
+    "capital_letter_item": 2,
+    "number_item": 3,
+    "lowercase_letter_item": 4,
+    "paragraph": 5
+}
+
+# Header types from highest to lowest level, with their patterns
+_HEADER_PATTERNS = (
+    ("section", _SECTION_PATTERN, _SECTION_GROUPS),
+    ("loa", _LOA_PATTERN, _LOA_GROUPS),
+    ("capital_letter_item", _CAPITAL_LETTER_PATTERN, _ITEM_GROUPS),
+    ("number_item", _NUMBER_PATTERN, _ITEM_GROUPS),
+    ("lowercase_letter_item", _LOWERCASE_LETTER_PATTERN, _ITEM_GROUPS),
+)
+
+
+def _fuse_header_patterns(header_patterns) -> Tuple[re.Pattern, Dict[str, Tuple[Tuple[int, int], ...]]]:
+    """
+    Join per-type header patterns into one alternation, tried in the same order.
+    
+    Each header type becomes a named group so ``match.lastgroup`` names the type
+    that matched.
+    
+    Returns:
+        Tuple of (compiled regex, header type -> (identifier, title) group indices)
+    """
+    branches = []
+    group_indices = {}
+    next_group = 1
+    for header_type, pattern, group_pairs in header_patterns:
+        flags = "i" if pattern.flags & re.IGNORECASE else ""
+        branches.append(f"(?P<{header_type}>(?{flags}:{pattern.pattern}))")
+        # Shift the pattern's own groups past the named group wrapping it
+        group_indices[header_type] = tuple(
+            (next_group + identifier_group, next_group + title_group)
+            for identifier_group, title_group in group_pairs
+        )
+        next_group += 1 + pattern.groups
+    return re.compile("|".join(branches)), group_indices
+
+
+def _header_fields(match: re.Match, group_pairs: Tuple[Tuple[int, int], ...]) -> Tuple[str, str]:
+    """Return (identifier, title) from whichever alternative of a header pattern matched"""
+    for identifier_group, title_group in group_pairs:
+        identifier = match.group(identifier_group)
+        if identifier is not None:
+            return identifier, match.group(title_group).strip()
+    raise ValueError("Header match has no identifier group")
+
+
+_HEADER_RE, _HEADER_GROUPS = _fuse_header_patterns(_HEADER_PATTERNS)
+
+# Position of each header type in _HEADER_PATTERNS, where the lower types to
+# retry after a failed validation start
+_HEADER_POSITIONS = {header_type: position
+                     for position, (header_type, _, _) in enumerate(_HEADER_PATTERNS)}
+
+# ASCII characters a stripped header line can start with; non-ASCII lines still
+# go to the regex since case folding and Unicode digits can match there
+_HEADER_START = frozenset(string.ascii_letters + string.digits + "(")
+
 
-@dataclass
 class HierarchyNode:
     """Represents a node in the hierarchical document structure"""
-    id: str
-    type: str  # "document", "section", "loa", "capital_letter_item", "number_item", "lowercase_letter_item", "paragraph"
-    identifier_text: Optional[str] = None  # e.g., "1", "A", "LOA 1"
-    title_text: Optional[str] = None  # Captured title line
-    content_text_blocks: List[Dict] = field(default_factory=list)  # Direct content TextBlocks
-    page_number_start: int = 1
-    page_number_end: int = 1
-    children: List['HierarchyNode'] = field(default_factory=list)  # Nested child nodes
-    font_characteristics_header: Optional[Dict] = None  # Font info of header line
-    indentation_header: Optional[float] = None  # Indentation of header line
+    
+    # Declared by hand rather than with @dataclass(slots=True), which needs Python 3.10
+    __slots__ = (
+        "id",
+        "type",  # "document", "section", "loa", "capital_letter_item", "number_item", "lowercase_letter_item", "paragraph"
+        "identifier_text",  # e.g., "1", "A", "LOA 1"
+        "title_text",  # Captured title line
+        "content_text_blocks",  # Direct content TextBlocks
+        "page_number_start",
+        "page_number_end",
+        "children",  # Nested child nodes
+        "font_characteristics_header",  # Font info of header line
+        "indentation_header",  # Indentation of header line
+        "level",  # Hierarchy level, lower number = higher level
+    )
+    
+    def __init__(self, id: str, type: str, identifier_text: Optional[str] = None,
+                 title_text: Optional[str] = None, content_text_blocks: Optional[List[Dict]] = None,
+                 page_number_start: int = 1, page_number_end: int = 1,
+                 children: Optional[List['HierarchyNode']] = None,
+                 font_characteristics_header: Optional[Dict] = None,
+                 indentation_header: Optional[float] = None, level: int = 5):
+        self.id = id
+        self.type = type
+        self.identifier_text = identifier_text
+        self.title_text = title_text
+        self.content_text_blocks = content_text_blocks if content_text_blocks is not None else []
+        self.page_number_start = page_number_start
+        self.page_number_end = page_number_end
+        self.children = children if children is not None else []
+        self.font_characteristics_header = font_characteristics_header
+        self.indentation_header = indentation_header
+        self.level = level
+    
+    def __repr__(self) -> str:
+        return (f"HierarchyNode(id={self.id!r}, type={self.type!r}, "
+                f"identifier_text={self.identifier_text!r}, title_text={self.title_text!r})")
 
 
 class HierarchicalParser:
     """Main hierarchical parsing engine for contract documents"""
     
+    # Compiled header patterns; a subclass overriding header_patterns should
+    # rebuild header_regex and header_groups with _fuse_header_patterns, and
+    # header_positions to match
+    header_patterns = _HEADER_PATTERNS
+    header_regex = _HEADER_RE
+    header_groups = _HEADER_GROUPS
+    header_positions = _HEADER_POSITIONS
+    
     def __init__(self, config: Optional[Dict] = None):
         """
         Initialize parser with configuration.
@@ -45,7 +166,10 @@ class HierarchicalParser:
         
         # Hierarchy tracking
         self.current_hierarchy_stack: List[HierarchyNode] = []
+        self._current_parent_indent = self.base_left_margin
+        self.root_nodes: List[HierarchyNode] = []
         self.next_node_id = 1
+        self.pages_processed = 0
     
     def parse_document(self, pages_text_blocks: List[List[Dict]], document_title: str = "") -> List[HierarchyNode]:
         """
@@ -61,23 +185,56 @@ class HierarchicalParser:
         logger.info(f"Starting hierarchical parsing of document with {len(pages_text_blocks)} pages")
         
         # Initialize with document root
-        self.current_hierarchy_stack = []
-        self.next_node_id = 1
-        root_nodes = []
+        self._reset_state()
         
         # Process all text blocks sequentially
-        for page_num, page_blocks in enumerate(pages_text_blocks, 1):
-            logger.debug(f"Processing page {page_num} with {len(page_blocks)} blocks")
-            
-            for block in page_blocks:
-                self._process_text_block(block, root_nodes)
+        for page_blocks in pages_text_blocks:
+            self.feed(page_blocks)
+        
+        return self.finalize()
+    
+    def feed(self, page_blocks: Iterable[Dict]) -> None:
+        """
+        Incrementally parse the text blocks of the next page.
+        
+        Args:
+            page_blocks: Normalized TextBlock dictionaries for a single page
+        """
+        self.pages_processed += 1
+        block_count = 0
+        
+        for block in page_blocks:
+            self._process_text_block(block, self.root_nodes)
+            block_count += 1
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Processed page {self.pages_processed} with {block_count} blocks")
+    
+    def finalize(self) -> List[HierarchyNode]:
+        """
+        Close any open nodes and return the parsed top-level nodes.
         
+        Returns:
+            List of top-level HierarchyNode objects
+        """
         # Close any remaining open nodes
         self._close_all_nodes()
+        root_nodes = self.root_nodes
         
         logger.info(f"Hierarchical parsing complete. Created {len(root_nodes)} top-level nodes")
+        
+        # Leave the parser ready for the next document
+        self._reset_state()
         return root_nodes
     
+    def _reset_state(self) -> None:
+        """Reset incremental parsing state"""
+        self.current_hierarchy_stack = []
+        self._current_parent_indent = self.base_left_margin
+        self.root_nodes = []
+        self.next_node_id = 1
+        self.pages_processed = 0
+    
     def _process_text_block(self, block: Dict, root_nodes: List[HierarchyNode]) -> None:
         """Process a single text block and update hierarchy"""
         try:
@@ -104,133 +261,57 @@ class HierarchicalParser:
             Tuple of (header_type, identifier, title) or None if not a header
         """
         text = block["text"].strip()
+        if not text or (text[0] not in _HEADER_START and text[0].isascii()):
+            return None
+        
         font_size = block["avg_font_size"]
         is_bold = block["is_bold"]
         indentation = block["indentation_level"]
         
-        # Try each header type from highest to lowest level
-        
-        # Section headers (highest level)
-        section_match = self._is_section_header(text, font_size, is_bold, indentation)
-        if section_match:
-            return ("section", section_match[0], section_match[1])
-        
-        # LOA headers
-        loa_match = self._is_loa_header(text, font_size, is_bold, indentation)
-        if loa_match:
-            return ("loa", loa_match[0], loa_match[1])
-        
-        # Get parent indentation for nested items
-        parent_indent = self._get_current_parent_indentation()
-        
-        # Capital letter items
-        capital_match = self._is_capital_letter_header(text, indentation, parent_indent)
-        if capital_match:
-            return ("capital_letter_item", capital_match[0], capital_match[1])
-        
-        # Number items
-        number_match = self._is_number_header(text, indentation, parent_indent)
-        if number_match:
-            return ("number_item", number_match[0], number_match[1])
-        
-        # Lowercase letter items
-        lowercase_match = self._is_lowercase_letter_header(text, indentation, parent_indent)
-        if lowercase_match:
-            return ("lowercase_letter_item", lowercase_match[0], lowercase_match[1])
-        
-        return None
-    
-    def _is_section_header(self, text: str, font_size: float, is_bold: bool, indentation: float) -> Optional[Tuple[str, str]]:
-        """Check if text is a section header"""
-        # Look for patterns like "SECTION 1", "SECTION IV", "ARTICLE 1", etc.
-        patterns = [
-            r"^\s*SECTION\s+([IVXLCDM\d]+)\s*[:.]?\s*(.*)",
-            r"^\s*ARTICLE\s+([IVXLCDM\d]+)\s*[:.]?\s*(.*)",
-            r"^\s*PART\s+([IVXLCDM\d]+)\s*[:.]?\s*(.*)",
-            r"^\s*([IVXLCDM]{1,4})\.\s+(.+)",  # Roman numeral with period
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text, re.IGNORECASE)
-            if match:
-                # Additional validation: should be near left margin and/or large font
-                if (indentation < self.base_left_margin + 20 or 
-                    font_size >= self.section_font_threshold or is_bold):
-                    return (match.group(1), match.group(2).strip())
-        
-        return None
-    
-    def _is_loa_header(self, text: str, font_size: float, is_bold: bool, indentation: float) -> Optional[Tuple[str, str]]:
-        """Check if text is a Letter of Agreement header"""
-        patterns = [
-            r"^\s*LETTER\s+OF\s+AGREEMENT\s*[#]?\s*(\d+|[IVXLCDM]+)\s*[:.]?\s*(.*)",
-            r"^\s*LOA\s*[#]?\s*(\d+|[IVXLCDM]+)\s*[:.]?\s*(.*)",
-            r"^\s*APPENDIX\s+([A-Z]+|\d+)\s*[:.]?\s*(.*)",
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text, re.IGNORECASE)
-            if match:
-                # Should be near left margin and/or emphasized
-                if (indentation < self.base_left_margin + 20 or 
-                    font_size >= self.heading_font_threshold or is_bold):
-                    return (match.group(1), match.group(2).strip())
-        
-        return None
-    
-    def _is_capital_letter_header(self, text: str, indentation: float, parent_indent: float) -> Optional[Tuple[str, str]]:
-        """Check if text is a capital letter item header"""
-        patterns = [
-            r"^\s*([A-Z])\s*[.)]\s*(.*)",
-            r"^\s*\(([A-Z])\)\s*(.*)",
-        ]
+        # Skip the regex when font and indentation rule out every header type
+        could_be_top_level = (indentation < self.base_left_margin + 20 or is_bold or
+                              font_size >= min(self.section_font_threshold, self.heading_font_threshold))
+        if not could_be_top_level and indentation <= self._current_parent_indent + self.indentation_tolerance:
+            return None
         
-        for pattern in patterns:
-            match = re.match(pattern, text)
-            if match:
-                # Should be indented relative to parent
-                if indentation > parent_indent + self.indentation_tolerance:
-                    return (match.group(1), match.group(2).strip())
+        # One scan tries every header type from highest to lowest level
+        match = self.header_regex.match(text)
+        if not match:
+            return None
         
-        return None
-    
-    def _is_number_header(self, text: str, indentation: float, parent_indent: float) -> Optional[Tuple[str, str]]:
-        """Check if text is a numbered item header"""
-        patterns = [
-            r"^\s*(\d+)\s*[.)]\s*(.*)",
-            r"^\s*\((\d+)\)\s*(.*)",
-        ]
+        header_type = match.lastgroup
+        if self._is_valid_header(header_type, font_size, is_bold, indentation):
+            return (header_type, *_header_fields(match, self.header_groups[header_type]))
         
-        for pattern in patterns:
-            match = re.match(pattern, text)
-            if match:
-                # Should be indented relative to parent
-                if indentation > parent_indent + self.indentation_tolerance:
-                    return (match.group(1), match.group(2).strip())
+        # The pattern hit failed validation; try the lower header types in order
+        for candidate_type, pattern, group_pairs in self.header_patterns[self.header_positions[header_type] + 1:]:
+            candidate = pattern.match(text)
+            if candidate and self._is_valid_header(candidate_type, font_size, is_bold, indentation):
+                return (candidate_type, *_header_fields(candidate, group_pairs))
         
         return None
     
-    def _is_lowercase_letter_header(self, text: str, indentation: float, parent_indent: float) -> Optional[Tuple[str, str]]:
-        """Check if text is a lowercase letter item header"""
-        patterns = [
-            r"^\s*([a-z])\s*[.)]\s*(.*)",
-            r"^\s*\(([a-z])\)\s*(.*)",
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text)
-            if match:
-                # Should be indented relative to parent
-                if indentation > parent_indent + self.indentation_tolerance:
-                    return (match.group(1), match.group(2).strip())
-        
-        return None
+    def _is_valid_header(self, header_type: str, font_size: float, is_bold: bool, indentation: float) -> bool:
+        """Check font and indentation cues for a header pattern hit"""
+        if header_type == "section":
+            # Should be near left margin and/or large font
+            return (indentation < self.base_left_margin + 20 or 
+                    font_size >= self.section_font_threshold or is_bold)
+        
+        if header_type == "loa":
+            # Should be near left margin and/or emphasized
+            return (indentation < self.base_left_margin + 20 or 
+                    font_size >= self.heading_font_threshold or is_bold)
+        
+        # Nested items should be indented relative to parent
+        return indentation > self._current_parent_indent + self.indentation_tolerance
     
-    def _get_current_parent_indentation(self) -> float:
-        """Get indentation level of current parent node"""
+    def _update_parent_indentation(self) -> None:
+        """Cache indentation level of current parent node after the stack changes"""
         if self.current_hierarchy_stack:
-            return self.current_hierarchy_stack[-1].indentation_header or self.base_left_margin
-        return self.base_left_margin
+            self._current_parent_indent = self.current_hierarchy_stack[-1].indentation_header or self.base_left_margin
+        else:
+            self._current_parent_indent = self.base_left_margin
     
     def _handle_header(self, block: Dict, header_type: str, identifier: str, title: str, root_nodes: List[HierarchyNode]) -> None:
         """Handle identification of a header block"""
@@ -251,7 +332,8 @@ class HierarchicalParser:
                 "is_bold": block["is_bold"],
                 "is_italic": block["is_italic"]
             },
-            indentation_header=block["indentation_level"]
+            indentation_header=block["indentation_level"],
+            level=_LEVEL_BY_TYPE.get(header_type, 5)
         )
         
         # Add to appropriate parent
@@ -262,8 +344,10 @@ class HierarchicalParser:
         
         # Push to stack
         self.current_hierarchy_stack.append(node)
+        self._current_parent_indent = node.indentation_header or self.base_left_margin
         
-        logger.debug(f"Created {header_type} node: {identifier} - {title}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Created {header_type} node: {identifier} - {title}")
     
     def _handle_content(self, block: Dict) -> None:
         """Handle content block (non-header)"""
@@ -278,26 +362,18 @@ class HierarchicalParser:
     
     def _close_nodes_for_level(self, new_header_type: str) -> None:
         """Close nodes that should be closed when a new header of given type is encountered"""
-        # Define hierarchy levels (lower number = higher level)
-        hierarchy_levels = {
-            "section": 1,
-            "loa": 1,
-            "capital_letter_item": 2,
-            "number_item": 3,
-            "lowercase_letter_item": 4,
-            "paragraph": 5
-        }
-        
-        new_level = hierarchy_levels.get(new_header_type, 5)
+        new_level = _LEVEL_BY_TYPE.get(new_header_type, 5)
+        stack = self.current_hierarchy_stack
         
         # Pop nodes from stack that are at same or lower level
-        while (self.current_hierarchy_stack and 
-               hierarchy_levels.get(self.current_hierarchy_stack[-1].type, 5) >= new_level):
-            self.current_hierarchy_stack.pop()
+        while stack and stack[-1].level >= new_level:
+            stack.pop()
+        self._update_parent_indentation()
     
     def _close_all_nodes(self) -> None:
         """Close all remaining open nodes"""
         self.current_hierarchy_stack.clear()
+        self._update_parent_indentation()
     
     def _generate_node_id(self) -> str:
         """Generate unique node ID"""
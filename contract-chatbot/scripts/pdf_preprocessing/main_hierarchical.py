@@ -4,6 +4,7 @@ Enhanced main orchestrator for PDF preprocessing pipeline with hierarchical pars
 import os
 import sys
 import logging
+from concurrent.futures import as_completed
 from typing import Dict, Any, List
 from pathlib import Path
 
@@ -13,7 +14,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import DOCUMENT_MAPPINGS, INPUT_PDF_DIR, OUTPUT_JSON_DIR
 from extract_hierarchical import extract_pdf_content_hierarchical, test_hierarchical_extraction
 from enrich import enrich_document_content
-from utils import validate_processed_document, save_json
+from utils import validate_processed_document, save_json, document_pool
 
 # Configure logging
 logging.basicConfig(
@@ -49,18 +50,34 @@ class HierarchicalPDFPreprocessor:
         logger.info(f"Input directory: {self.input_dir}")
         logger.info(f"Output directory: {self.output_dir}")
         
-        for pdf_filename, json_filename in DOCUMENT_MAPPINGS.items():
-            logger.info(f"\n{'='*50}")
-            logger.info(f"Processing: {pdf_filename} -> {json_filename}")
-            logger.info(f"{'='*50}")
+        # Documents are independent, so each one runs in its own worker process
+        # and is reported as soon as it finishes
+        with document_pool(len(DOCUMENT_MAPPINGS)) as executor:
+            futures = {
+                executor.submit(self.process_single_document, pdf_filename, json_filename): (pdf_filename, json_filename)
+                for pdf_filename, json_filename in DOCUMENT_MAPPINGS.items()
+            }
             
-            success = self.process_single_document(pdf_filename, json_filename)
-            results[pdf_filename] = success
-            
-            if success:
-                logger.info(f"✅ Successfully processed {pdf_filename}")
-            else:
-                logger.error(f"❌ Failed to process {pdf_filename}")
+            for future in as_completed(futures):
+                pdf_filename, json_filename = futures[future]
+                logger.info(f"\n{'='*50}")
+                logger.info(f"Processed: {pdf_filename} -> {json_filename}")
+                logger.info(f"{'='*50}")
+                
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logger.error(f"Worker failed while processing {pdf_filename}: {e}")
+                    success = False
+                
+                if success:
+                    logger.info(f"✅ Successfully processed {pdf_filename}")
+                else:
+                    logger.error(f"❌ Failed to process {pdf_filename}")
+                results[pdf_filename] = success
+        
+        # Report in configuration order rather than completion order
+        results = {pdf_filename: results[pdf_filename] for pdf_filename in DOCUMENT_MAPPINGS}
         
         # Print summary
         self._print_summary(results)
@@ -96,7 +113,7 @@ class HierarchicalPDFPreprocessor:
             )
             
             if not structured_doc.get('sections'):
-                logger.error("No sections created during extraction/structuring")
+                logger.error(f"No sections created while extracting/structuring {pdf_filename}")
                 return False
             
             logger.info(f"Created {len(structured_doc['sections'])} sections")
@@ -110,7 +127,7 @@ class HierarchicalPDFPreprocessor:
             validation_errors = validate_processed_document(enriched_doc)
             
             if validation_errors:
-                logger.warning("Validation warnings found:")
+                logger.warning(f"Validation warnings found in {pdf_filename}:")
                 for error in validation_errors:
                     logger.warning(f"  - {error}")
             
@@ -1,14 +1,101 @@
 """
 Structure module for transforming raw PDF text blocks into ProcessedDocumentType
 """
+import re
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any
 from extract import TextBlock
-from utils import generate_section_id, is_heading
+from utils import generate_section_ids, is_heading
 from config import HEADING_FONT_SIZE_THRESHOLD, SUBHEADING_FONT_SIZE_THRESHOLD
 
 logger = logging.getLogger(__name__)
 
+# Line prefixes that mark a list item: bullets, numbered (1. or 1)),
+# lettered (a. or a)) and dash bullets
+_LIST_LINE_RE = re.compile(r'^\s*(?:•|\d+[.)]|[a-zA-Z][.)]|-\s+)')
+
+# Column separators tried when looking for a table
+_TABLE_SEPARATORS = ('\t', '  ', ' | ', '|')
+
+# Placeholder metadata shared by every section. Immutable so no section can
+# change another's; enrichment replaces these values rather than mutating them
+_DEFAULT_GLOSSARY_TERMS = ()
+_DEFAULT_AFFECTS = ("all_flight_attendants",)
+
+
+@lru_cache(maxsize=4096)
+def _classify_section_type(content: str, font_size: float) -> str:
+    """
+    Determine the type of section based on content and formatting
+    
+    Args:
+        content: Block content
+        font_size: Block font size
+        
+    Returns:
+        "heading", "list", "table" or "paragraph"
+    """
+    content = content.strip()
+    
+    # Check if it's a heading based on font size and content
+    if is_heading(content, font_size, HEADING_FONT_SIZE_THRESHOLD):
+        return "heading"
+    
+    # Lists and tables need line breaks, so single-line blocks are paragraphs
+    if '\n' not in content:
+        return "paragraph"
+    
+    return _classify_multiline_content(content)
+
+
+def _classify_multiline_content(content: str) -> str:
+    """
+    Classify multi-line content as a list, table or paragraph
+    
+    List markers and table columns are tallied in a single pass over the
+    lines instead of splitting the content once per check.
+    
+    Args:
+        content: Stripped block content containing at least one line break
+    
+    Returns:
+        "list", "table" or "paragraph"
+    """
+    lines = content.split('\n')
+    
+    # Separators that could still give every row the same number of columns
+    # (more than one); a separator missing from the content never can
+    separators = [separator for separator in _TABLE_SEPARATORS if separator in content]
+    first_column_counts = {}
+    list_line_count = 0
+    row_count = 0
+    
+    for line in lines:
+        if _LIST_LINE_RE.match(line):
+            list_line_count += 1
+        
+        if separators and line.strip():
+            row_count += 1
+            # Counting separators gives the column count without splitting;
+            # a separator is dropped at the first row that rules it out
+            for separator in tuple(separators):
+                column_count = line.count(separator) + 1
+                first_count = first_column_counts.setdefault(separator, column_count)
+                if column_count == 1 or column_count != first_count:
+                    separators.remove(separator)
+    
+    # If more than half the lines look like list items, consider it a list
+    if list_line_count > len(lines) * 0.5:
+        return "list"
+    
+    # A table needs at least 3 rows with a consistent number of columns
+    if row_count > 2 and separators:
+        return "table"
+    
+    # Default to paragraph
+    return "paragraph"
+
 
 class DocumentStructurer:
     """Transforms text blocks into structured document format"""
@@ -61,75 +148,108 @@ class DocumentStructurer:
         if not text_blocks:
             return []
         
+        # Each block is checked for a heading once, not once per neighbour
+        heading_flags = [is_heading(block.content, block.font_size, SUBHEADING_FONT_SIZE_THRESHOLD)
+                         for block in text_blocks]
+        lengths = [len(block.content) for block in text_blocks]
+        
         merged = []
-        current_block = text_blocks[0]
+        
+        # The current run of blocks to merge; its first block supplies the font
+        # size, page and bbox, and the merged TextBlock is only built once the
+        # run ends. The joined text is kept as it grows for the heading check
+        run_start = text_blocks[0]
+        current_content = run_start.content
+        current_is_heading = heading_flags[0]
+        current_len = lengths[0]
         
         for i in range(1, len(text_blocks)):
             next_block = text_blocks[i]
             
             # Check if blocks should be merged
-            if self._should_merge_blocks(current_block, next_block):
+            if self._should_merge_blocks(run_start, next_block,
+                                         current_is_heading, heading_flags[i],
+                                         current_len, lengths[i]):
                 # Merge the blocks
-                merged_content = current_block.content + " " + next_block.content
-                current_block = TextBlock(
-                    content=merged_content,
-                    font_size=current_block.font_size,  # Keep original font size
-                    page_num=current_block.page_num,
-                    bbox=current_block.bbox
-                )
+                current_content = current_content + " " + next_block.content
+                current_len += 1 + lengths[i]
+                # Joining can complete a heading pattern across the boundary; the
+                # flag is only read for blocks short enough to merge again
+                current_is_heading = current_len < 100 and is_heading(
+                    current_content, run_start.font_size, SUBHEADING_FONT_SIZE_THRESHOLD)
             else:
                 # Start new block
-                merged.append(current_block)
-                current_block = next_block
+                merged.append(self._finish_merge_run(run_start, current_content))
+                run_start = next_block
+                current_content = next_block.content
+                current_is_heading = heading_flags[i]
+                current_len = lengths[i]
         
         # Add the last block
-        merged.append(current_block)
+        merged.append(self._finish_merge_run(run_start, current_content))
         
         logger.info(f"Merged {len(text_blocks)} blocks into {len(merged)} blocks")
         return merged
     
-    def _should_merge_blocks(self, block1: TextBlock, block2: TextBlock) -> bool:
-        """Determine if two consecutive blocks should be merged"""
-        # Don't merge if font sizes are very different (likely different sections)
-        font_diff = abs(block1.font_size - block2.font_size)
-        if font_diff > 2.0:
-            return False
+    def _finish_merge_run(self, run_start: TextBlock, content: str) -> TextBlock:
+        """Build the block for a run of merged blocks, reusing a lone block as is"""
+        if content is run_start.content:  # Nothing was merged into it
+            return run_start
+        
+        return TextBlock(
+            content=content,
+            font_size=run_start.font_size,  # Keep original font size
+            page_num=run_start.page_num,
+            bbox=run_start.bbox
+        )
+    
+    def _should_merge_blocks(self, block1: TextBlock, block2: TextBlock,
+                             block1_is_heading: bool, block2_is_heading: bool,
+                             block1_len: int, block2_len: int) -> bool:
+        """
+        Determine if two consecutive blocks should be merged
         
-        # Don't merge if either block looks like a heading
-        if (is_heading(block1.content, block1.font_size, SUBHEADING_FONT_SIZE_THRESHOLD) or
-            is_heading(block2.content, block2.font_size, SUBHEADING_FONT_SIZE_THRESHOLD)):
+        Args:
+            block1: First block of the current run of merged blocks
+            block2: Next block
+            block1_is_heading: Precomputed is_heading result for the current run
+            block2_is_heading: Precomputed is_heading result for block2
+            block1_len: Content length of the current run once joined
+            block2_len: len(block2.content)
+        """
+        # Every rule must pass, so the cheapest and most selective run first.
+        # Only short blocks are merged; long blocks are kept apart by default
+        if block1_len >= 100 or block2_len >= 100:
             return False
         
         # Don't merge if blocks are on different pages and content is substantial
         if (block1.page_num != block2.page_num and 
-            (len(block1.content) > 50 or len(block2.content) > 50)):
+            (block1_len > 50 or block2_len > 50)):
             return False
         
-        # Merge if blocks are short and likely continuation of same paragraph
-        if len(block1.content) < 100 and len(block2.content) < 100:
-            return True
+        # Don't merge if font sizes are very different (likely different sections)
+        font_diff = abs(block1.font_size - block2.font_size)
+        if font_diff > 2.0:
+            return False
         
-        # Don't merge long blocks by default
-        return False
+        # Don't merge if either block looks like a heading; otherwise the short
+        # blocks are likely a continuation of the same paragraph
+        return not (block1_is_heading or block2_is_heading)
     
     def _identify_sections(self, text_blocks: List[TextBlock]) -> List[Dict[str, Any]]:
         """Identify and create sections from text blocks"""
-        sections = []
+        # Generate unique section IDs for the whole document at once
+        section_ids = generate_section_ids([block.content for block in text_blocks], self.doc_id)
         
-        for i, block in enumerate(text_blocks):
-            section = self._create_section(block, i)
-            sections.append(section)
-        
-        return sections
+        create_section = self._create_section
+        return [create_section(block, section_id)
+                for block, section_id in zip(text_blocks, section_ids)]
     
-    def _create_section(self, block: TextBlock, index: int) -> Dict[str, Any]:
-        """Create a section from a text block"""
+    def _create_section(self, block: TextBlock, section_id: str) -> Dict[str, Any]:
+        """Create a section from a text block and its precomputed ID"""
         # Determine section type
         section_type = self._determine_section_type(block)
         
-        # Generate unique section ID
-        section_id = generate_section_id(block.content, self.doc_id, index)
-        
         # Create basic section structure
         section = {
             "id": section_id,
@@ -139,8 +259,8 @@ class DocumentStructurer:
             "metadata": {
                 "category": "general",  # Will be enriched later
                 "importance": "low",    # Will be enriched later
-                "glossaryTerms": [],    # Will be enriched later
-                "affects": ["all_flight_attendants"]  # Will be enriched later
+                "glossaryTerms": _DEFAULT_GLOSSARY_TERMS,  # Will be enriched later
+                "affects": _DEFAULT_AFFECTS  # Will be enriched later
             }
         }
         
@@ -148,69 +268,8 @@ class DocumentStructurer:
     
     def _determine_section_type(self, block: TextBlock) -> str:
         """Determine the type of section based on content and formatting"""
-        content = block.content.strip()
-        
-        # Check if it's a heading based on font size and content
-        if is_heading(content, block.font_size, HEADING_FONT_SIZE_THRESHOLD):
-            return "heading"
-        
-        # Check for list patterns
-        if self._is_list_content(content):
-            return "list"
-        
-        # Check for table patterns (basic detection)
-        if self._is_table_content(content):
-            return "table"
-        
-        # Default to paragraph
-        return "paragraph"
-    
-    def _is_list_content(self, content: str) -> bool:
-        """Check if content appears to be a list"""
-        lines = content.split('\n')
-        
-        # Check for bullet points or numbered lists
-        list_patterns = [
-            r'^\s*•',           # Bullet points
-            r'^\s*\d+\.',       # Numbered list (1., 2., etc.)
-            r'^\s*\d+\)',       # Numbered list (1), 2), etc.)
-            r'^\s*[a-zA-Z]\.',  # Lettered list (a., b., etc.)
-            r'^\s*[a-zA-Z]\)',  # Lettered list (a), b), etc.)
-            r'^\s*-\s+',        # Dash bullets
-        ]
-        
-        import re
-        list_line_count = 0
-        
-        for line in lines:
-            for pattern in list_patterns:
-                if re.match(pattern, line):
-                    list_line_count += 1
-                    break
-        
-        # If more than half the lines look like list items, consider it a list
-        return len(lines) > 1 and list_line_count > len(lines) * 0.5
-    
-    def _is_table_content(self, content: str) -> bool:
-        """Check if content appears to be a table"""
-        lines = content.split('\n')
-        
-        # Look for table-like patterns
-        # This is a basic implementation - could be enhanced
-        
-        # Check for consistent column separators
-        separator_patterns = ['\t', '  ', ' | ', '|']
-        
-        for separator in separator_patterns:
-            separated_lines = [line.split(separator) for line in lines if line.strip()]
-            
-            if len(separated_lines) > 2:  # At least 3 rows
-                # Check if rows have consistent number of columns
-                column_counts = [len(row) for row in separated_lines]
-                if len(set(column_counts)) == 1 and column_counts[0] > 1:
-                    return True
-        
-        return False
+        # Repeated boilerplate (headers, footers, standard clauses) hits the cache
+        return _classify_section_type(block.content, block.font_size)
 
 
 def structure_pdf_content(doc_id: str, text_blocks: List[TextBlock], 
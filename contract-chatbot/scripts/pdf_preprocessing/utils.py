@@ -1,10 +1,81 @@
 """
 Utility functions for PDF preprocessing pipeline
 """
+import os
 import re
 import hashlib
 import json
-from typing import Any, Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Literal, Optional
+from config import WORKER_BUDGET_ENV
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# Whitespace runs collapse to a single space
+_WS_RE = re.compile(r'\s+')
+
+# ASCII control characters; newlines and tabs are gone once whitespace is collapsed
+_CLEAN_TABLE = str.maketrans('', '', ''.join(map(chr, range(0x20))) + '\x7f')
+
+
+def available_workers() -> int:
+    """
+    Number of worker processes this process may start for a parallel step
+    
+    Defaults to the CPU count. Inside a document worker it is that worker's
+    share of the CPUs, so nested extraction and enrichment pools do not
+    oversubscribe the machine.
+    """
+    budget = os.environ.get(WORKER_BUDGET_ENV)
+    if budget:
+        return max(int(budget), 1)
+    return os.cpu_count() or 1
+
+
+def set_worker_budget(workers: int) -> None:
+    """
+    Limit the worker processes this process and its children may start
+    
+    Used as the initializer of document worker pools.
+    
+    Args:
+        workers: Worker processes allowed for nested pools (1 keeps them serial)
+    """
+    os.environ[WORKER_BUDGET_ENV] = str(workers)
+
+
+def document_pool(document_count: int) -> ProcessPoolExecutor:
+    """
+    Create the process pool that runs one document per worker
+    
+    The CPUs are split between the document workers, and each worker's share
+    becomes the budget for its own extraction and enrichment pools.
+    
+    Args:
+        document_count: Number of documents that will be submitted
+        
+    Returns:
+        ProcessPoolExecutor sized for the documents and the available CPUs
+    """
+    cpu_count = available_workers()
+    max_workers = min(document_count, cpu_count) or 1
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=set_worker_budget,
+                               initargs=(cpu_count // max_workers,))
 
 
 def clean_text(text: str) -> str:
@@ -13,25 +84,42 @@ def clean_text(text: str) -> str:
         return ""
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove non-printable characters except newlines and tabs
-    text = re.sub(r'[^\x20-\x7E\n\t]', '', text)
+    text = _WS_RE.sub(' ', text)
     
-    # Normalize quotes
-    text = text.replace('"', '"').replace('"', '"')
-    text = text.replace(''', "'").replace(''', "'")
+    # Remove non-printable characters, including anything outside ASCII
+    if not text.isascii():
+        text = text.encode('ascii', 'ignore').decode('ascii')
     
-    return text.strip()
+    return text.translate(_CLEAN_TABLE).strip()
 
 
 def generate_section_id(content: str, doc_id: str, section_index: int) -> str:
     """Generate a unique ID for a section"""
     # Create a hash of the content for uniqueness
-    content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
+    content_hash = hashlib.blake2b(content.encode(), digest_size=4).hexdigest()
     return f"{doc_id}_section_{section_index:03d}_{content_hash}"
 
 
+def generate_section_ids(contents: List[str], doc_id: str) -> List[str]:
+    """
+    Generate the IDs for a document's sections in one call
+    
+    Matches generate_section_id(content, doc_id, index) for each content
+    in order, with the prefix and hash function looked up once.
+    
+    Args:
+        contents: Section contents in document order
+        doc_id: Document identifier
+        
+    Returns:
+        List of section IDs
+    """
+    prefix = f"{doc_id}_section_"
+    blake2b = hashlib.blake2b
+    return [f"{prefix}{index:03d}_{blake2b(content.encode(), digest_size=4).hexdigest()}"
+            for index, content in enumerate(contents)]
+
+
 def is_heading(text: str, font_size: float, heading_threshold: float) -> bool:
     """Determine if text block is a heading based on content and font size"""
     from config import HEADING_PATTERNS
@@ -48,84 +136,198 @@ def is_heading(text: str, font_size: float, heading_threshold: float) -> bool:
     return False
 
 
-def categorize_section(content: str) -> str:
-    """Categorize a section based on its content"""
-    from config import CATEGORY_MAPPINGS
+@lru_cache(maxsize=None)
+def _all_keywords() -> FrozenSet[str]:
+    """Every lowercased keyword the section classifiers look for"""
+    from config import (
+        CATEGORY_MAPPINGS, HIGH_IMPORTANCE_KEYWORDS, MEDIUM_IMPORTANCE_KEYWORDS,
+        GLOSSARY_TERMS, AFFECTS_MAPPINGS
+    )
     
-    content_lower = content.lower()
-    category_scores = {}
+    keywords = set(HIGH_IMPORTANCE_KEYWORDS) | set(MEDIUM_IMPORTANCE_KEYWORDS)
+    keywords.update(term.lower() for term in GLOSSARY_TERMS)
+    for mapping in (CATEGORY_MAPPINGS, AFFECTS_MAPPINGS):
+        for group_keywords in mapping.values():
+            keywords.update(group_keywords)
+    return frozenset(keywords)
+
+
+@lru_cache(maxsize=None)
+def _keyword_automaton():
+    """Build one Aho-Corasick automaton over every classifier keyword"""
+    automaton = ahocorasick.Automaton()
+    for keyword in _all_keywords():
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=None)
+def _category_index():
+    """
+    Map each category keyword to the categories it scores for.
+    
+    Returns:
+        Tuple of (keyword -> tuple of categories, categories in config order);
+        a keyword listed twice under one category appears twice
+    """
+    from config import CATEGORY_MAPPINGS
     
+    categories_by_keyword = {}
     for category, keywords in CATEGORY_MAPPINGS.items():
-        score = sum(1 for keyword in keywords if keyword in content_lower)
-        if score > 0:
-            category_scores[category] = score
+        for keyword in keywords:
+            categories_by_keyword.setdefault(keyword, []).append(category)
+    return ({keyword: tuple(categories) for keyword, categories in categories_by_keyword.items()},
+            tuple(CATEGORY_MAPPINGS))
+
+
+@lru_cache(maxsize=None)
+def _affects_keyword_sets():
+    """Affected groups in config order with their keywords as frozensets"""
+    from config import AFFECTS_MAPPINGS
+    
+    return tuple((group, frozenset(keywords)) for group, keywords in AFFECTS_MAPPINGS.items()
+                 if group != "all_flight_attendants")
+
+
+@lru_cache(maxsize=None)
+def _groups_matching_category(category: str) -> FrozenSet[str]:
+    """Affected groups with a keyword that occurs inside the category name"""
+    from config import AFFECTS_MAPPINGS
+    
+    return frozenset(group for group, keywords in AFFECTS_MAPPINGS.items()
+                     if any(keyword in category for keyword in keywords))
+
+
+@lru_cache(maxsize=64)
+def _find_keywords(content_lower: str) -> FrozenSet[str]:
+    """
+    Find which classifier keywords occur in lowercased content.
+    
+    Cached so the classifiers called back to back on one section share a single
+    scan; callers that already hold the lowercased text pass it as content_lower.
+    """
+    if ahocorasick is None:
+        return frozenset(keyword for keyword in _all_keywords() if keyword in content_lower)
+    return frozenset(keyword for _, keyword in _keyword_automaton().iter(content_lower))
+
+
+def categorize_section(content: str, content_lower: Optional[str] = None) -> str:
+    """Categorize a section based on its content"""
+    if content_lower is None:
+        content_lower = content.lower()
+    categories_by_keyword, category_order = _category_index()
+    
+    # Only the keywords actually found are visited, not every configured one
+    category_scores = {}
+    for keyword in _find_keywords(content_lower):
+        for category in categories_by_keyword.get(keyword, ()):
+            category_scores[category] = category_scores.get(category, 0) + 1
     
-    # Return category with highest score, default to 'general'
+    # Return category with highest score, default to 'general'; ties go to
+    # the category listed first in the config
     if category_scores:
-        return max(category_scores, key=category_scores.get)
+        return max((category for category in category_order if category in category_scores),
+                   key=category_scores.get)
     return "general"
 
 
-def determine_importance(content: str) -> str:
+def determine_importance(content: str, content_lower: Optional[str] = None) -> str:
     """Determine importance level of a section"""
-    from config import HIGH_IMPORTANCE_KEYWORDS, MEDIUM_IMPORTANCE_KEYWORDS
+    from config import HIGH_IMPORTANCE_SET, MEDIUM_IMPORTANCE_SET
     
-    content_lower = content.lower()
+    if content_lower is None:
+        content_lower = content.lower()
+    found = _find_keywords(content_lower)
     
     # Check for high importance keywords
-    for keyword in HIGH_IMPORTANCE_KEYWORDS:
-        if keyword in content_lower:
-            return "high"
+    if not found.isdisjoint(HIGH_IMPORTANCE_SET):
+        return "high"
     
     # Check for medium importance keywords
-    for keyword in MEDIUM_IMPORTANCE_KEYWORDS:
-        if keyword in content_lower:
-            return "medium"
+    if not found.isdisjoint(MEDIUM_IMPORTANCE_SET):
+        return "medium"
     
     return "low"
 
 
-def find_glossary_terms(content: str) -> List[str]:
+def find_glossary_terms(content: str, content_lower: Optional[str] = None) -> List[str]:
     """Find glossary terms in content"""
-    from config import GLOSSARY_TERMS
+    from config import GLOSSARY_TERMS, GLOSSARY_TERMS_SET
     
-    content_lower = content.lower()
-    found_terms = []
+    if content_lower is None:
+        content_lower = content.lower()
+    matched = _find_keywords(content_lower) & GLOSSARY_TERMS_SET
+    if not matched:
+        return []
     
-    for term in GLOSSARY_TERMS:
-        if term.lower() in content_lower:
-            found_terms.append(term)
-    
-    return found_terms
+    # Walk the list only when something matched, to keep glossary order
+    return [term for term in GLOSSARY_TERMS if term.lower() in matched]
 
 
-def determine_affects(content: str, category: str) -> List[str]:
+def determine_affects(content: str, category: str, content_lower: Optional[str] = None) -> List[str]:
     """Determine which groups this section affects"""
-    from config import AFFECTS_MAPPINGS
-    
-    content_lower = content.lower()
+    if content_lower is None:
+        content_lower = content.lower()
+    found = _find_keywords(content_lower)
     affects = ["all_flight_attendants"]  # Default
     
-    for group, keywords in AFFECTS_MAPPINGS.items():
-        if group == "all_flight_attendants":
-            continue
-        
-        for keyword in keywords:
-            if keyword in content_lower or keyword in category:
-                if group not in affects:
-                    affects.append(group)
-                break
+    groups_by_category = _groups_matching_category(category)
+    for group, keywords in _affects_keyword_sets():
+        if group in groups_by_category or not found.isdisjoint(keywords):
+            affects.append(group)
     
     return affects
 
 
+# Processed document schema
+REQUIRED_DOCUMENT_FIELDS = ("id", "title", "sections")
+REQUIRED_SECTION_FIELDS = ("id", "type", "content")
+VALID_SECTION_TYPES = ("heading", "paragraph", "table", "list")
+VALID_CATEGORIES = ("scheduling", "pay", "benefits", "work_rules", "general")
+VALID_IMPORTANCE = ("high", "medium", "low")
+
+if msgspec is not None:
+    # Same constraints as validate_section, checked in one compiled pass
+    class _SectionMetadataSchema(msgspec.Struct):
+        category: Literal[VALID_CATEGORIES] = "general"
+        importance: Literal[VALID_IMPORTANCE] = "low"
+    
+    class _SectionSchema(msgspec.Struct):
+        id: Any
+        type: Literal[VALID_SECTION_TYPES]
+        content: Any
+        metadata: _SectionMetadataSchema = None
+    
+    class _DocumentSchema(msgspec.Struct):
+        id: Any
+        title: Any
+        sections: List[_SectionSchema]
+
+
+def _matches_document_schema(doc_data: Dict[str, Any]) -> bool:
+    """Check a document against the msgspec schema when msgspec is installed"""
+    if msgspec is None:
+        return False
+    
+    try:
+        msgspec.convert(doc_data, _DocumentSchema)
+    except msgspec.ValidationError:
+        return False
+    return True
+
+
 def validate_processed_document(doc_data: Dict[str, Any]) -> List[str]:
     """Validate processed document structure and return any errors"""
+    # Valid documents pass the compiled schema; only invalid ones need the
+    # field-by-field walk to report every error
+    if _matches_document_schema(doc_data):
+        return []
+    
     errors = []
     
     # Check required fields
-    required_fields = ["id", "title", "sections"]
-    for field in required_fields:
+    for field in REQUIRED_DOCUMENT_FIELDS:
         if field not in doc_data:
             errors.append(f"Missing required field: {field}")
     
@@ -143,14 +345,12 @@ def validate_section(section: Dict[str, Any], index: int) -> List[str]:
     errors = []
     
     # Check required fields
-    required_fields = ["id", "type", "content"]
-    for field in required_fields:
+    for field in REQUIRED_SECTION_FIELDS:
         if field not in section:
             errors.append(f"Section {index}: Missing required field: {field}")
     
     # Validate section type
-    valid_types = ["heading", "paragraph", "table", "list"]
-    if "type" in section and section["type"] not in valid_types:
+    if "type" in section and section["type"] not in VALID_SECTION_TYPES:
         errors.append(f"Section {index}: Invalid type: {section['type']}")
     
     # Validate metadata structure
@@ -160,13 +360,11 @@ def validate_section(section: Dict[str, Any], index: int) -> List[str]:
             errors.append(f"Section {index}: metadata must be a dictionary")
         else:
             # Check category
-            valid_categories = ["scheduling", "pay", "benefits", "work_rules", "general"]
-            if "category" in metadata and metadata["category"] not in valid_categories:
+            if "category" in metadata and metadata["category"] not in VALID_CATEGORIES:
                 errors.append(f"Section {index}: Invalid category: {metadata['category']}")
             
             # Check importance
-            valid_importance = ["high", "medium", "low"]
-            if "importance" in metadata and metadata["importance"] not in valid_importance:
+            if "importance" in metadata and metadata["importance"] not in VALID_IMPORTANCE:
                 errors.append(f"Section {index}: Invalid importance: {metadata['importance']}")
     
     return errors
@@ -174,11 +372,21 @@ def validate_section(section: Dict[str, Any], index: int) -> List[str]:
 
 def save_json(data: Dict[str, Any], filepath: str) -> None:
     """Save data to JSON file with proper formatting"""
+    if orjson is not None:
+        # orjson encodes straight to UTF-8 bytes with the same 2-space layout
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
 def load_json(filepath: str) -> Dict[str, Any]:
     """Load data from JSON file"""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    
     with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f) 
\ No newline at end of file
+        return json.load(f)
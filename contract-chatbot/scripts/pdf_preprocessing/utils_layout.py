@@ -4,10 +4,19 @@ Task 2 implementation from pdf-parsing.md plan
 """
 import fitz  # PyMuPDF
 import logging
-from typing import List, Dict, Any, Tuple
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Tuple, Iterable, Iterator, Optional
+from config import PARALLEL_EXTRACTION_MIN_PAGES, PARALLEL_EXTRACTION_CHUNK_PAGES
+from utils import available_workers
 
 logger = logging.getLogger(__name__)
 
+# PyMuPDF's default "dict" flags minus image extraction; image blocks are
+# skipped anyway, so there is no point decoding their pixel data
+TEXT_DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
 
 def extract_raw_page_data(page: fitz.Page) -> List[Dict]:
     """
@@ -21,7 +30,7 @@ def extract_raw_page_data(page: fitz.Page) -> List[Dict]:
     """
     try:
         # Get text dictionary with detailed formatting information
-        text_dict = page.get_text("dict")
+        text_dict = page.get_text("dict", flags=TEXT_DICT_FLAGS)
         raw_blocks = []
         
         for block in text_dict["blocks"]:
@@ -42,11 +51,9 @@ def extract_raw_page_data(page: fitz.Page) -> List[Dict]:
                         span_data = {
                             "text": span.get("text", ""),
                             "bbox": span.get("bbox", (0, 0, 0, 0)),
-                            "origin": span.get("origin", (0, 0)),
                             "font_name": span.get("font", ""),
                             "font_size": span.get("size", 10.0),
-                            "font_flags": span.get("flags", 0),
-                            "color": span.get("color", 0)
+                            "font_flags": span.get("flags", 0)
                         }
                         line_data["spans"].append(span_data)
                     
@@ -81,6 +88,76 @@ def parse_font_flags(flags: int) -> Dict[str, bool]:
     }
 
 
+# parse_font_flags only reads the low six bits, so every result can be
+# precomputed; index with flags & _FLAG_MASK. The dicts are shared, so
+# callers must not mutate them.
+_FLAG_MASK = 0x3F
+_FLAG_TABLE = tuple(parse_font_flags(i) for i in range(_FLAG_MASK + 1))
+_IS_BOLD_TABLE = bytes(1 if i & 2**4 else 0 for i in range(_FLAG_MASK + 1))
+_IS_ITALIC_TABLE = bytes(1 if i & 2**1 else 0 for i in range(_FLAG_MASK + 1))
+
+
+def _aggregate_block_spans(span_fields: Iterable[Tuple[str, float, str, int]],
+                           bbox: Tuple[float, float, float, float],
+                           include_spans: bool = True) -> Optional[Dict]:
+    """
+    Fold one block's spans into a TextBlock dictionary in a single pass.
+    
+    Args:
+        span_fields: (text, font_size, font_name, font_flags) for each span
+        bbox: Block bounding box
+        include_spans: Whether to keep the per-span raw_spans list
+        
+    Returns:
+        TextBlock dictionary without page_number, or None if the block has no text
+    """
+    all_text = []
+    raw_spans = []
+    font_size_sum = 0.0
+    font_names = Counter()
+    bold_spans = 0
+    italic_spans = 0
+    
+    for text, font_size, font_name, font_flags in span_fields:
+        if not text.strip():
+            continue
+        
+        flag_bits = font_flags & _FLAG_MASK
+        
+        all_text.append(text)
+        font_size_sum += font_size
+        font_names[font_name] += 1
+        bold_spans += _IS_BOLD_TABLE[flag_bits]
+        italic_spans += _IS_ITALIC_TABLE[flag_bits]
+        
+        if include_spans:
+            raw_spans.append({
+                "text": text,
+                "font_size": font_size,
+                "font_name": font_name,
+                "font_props": _FLAG_TABLE[flag_bits]
+            })
+    
+    if not all_text:
+        return None
+    
+    total_spans = len(all_text)
+    
+    block_info = {
+        "text": " ".join(all_text).strip(),
+        "bbox": bbox,
+        "indentation_level": bbox[0],  # Left x-coordinate
+        "avg_font_size": font_size_sum / total_spans,
+        "dominant_font_name": font_names.most_common(1)[0][0],
+        "is_bold": (bold_spans / total_spans) > 0.5,
+        "is_italic": (italic_spans / total_spans) > 0.5,
+        "span_count": total_spans
+    }
+    if include_spans:
+        block_info["raw_spans"] = raw_spans
+    return block_info
+
+
 def normalize_text_block_info(raw_block_data: Dict) -> Dict:
     """
     Convert raw block data into a normalized TextBlock structure for hierarchical parsing.
@@ -92,75 +169,55 @@ def normalize_text_block_info(raw_block_data: Dict) -> Dict:
         Normalized TextBlock dictionary ready for hierarchical parsing
     """
     try:
-        # Collect all text and analyze properties
-        all_text = []
-        font_sizes = []
-        font_names = []
-        bold_spans = 0
-        italic_spans = 0
-        total_spans = 0
-        
-        for line in raw_block_data["lines"]:
-            line_text = []
-            for span in line["spans"]:
-                text = span["text"]
-                if text.strip():
-                    all_text.append(text)
-                    line_text.append(text)
-                    
-                    # Collect font properties
-                    font_sizes.append(span["font_size"])
-                    font_names.append(span["font_name"])
-                    
-                    # Parse font flags
-                    font_props = parse_font_flags(span["font_flags"])
-                    if font_props["is_bold"]:
-                        bold_spans += 1
-                    if font_props["is_italic"]:
-                        italic_spans += 1
-                    total_spans += 1
-        
-        if not all_text:
-            return None
-        
-        # Calculate aggregate properties
-        text = " ".join(all_text).strip()
-        bbox = raw_block_data["block_bbox"]
-        indentation_level = bbox[0]  # Left x-coordinate
-        
-        avg_font_size = sum(font_sizes) / len(font_sizes) if font_sizes else 10.0
-        dominant_font_name = max(set(font_names), key=font_names.count) if font_names else ""
-        
-        is_bold_block = (bold_spans / total_spans) > 0.5 if total_spans > 0 else False
-        is_italic_block = (italic_spans / total_spans) > 0.5 if total_spans > 0 else False
-        
-        return {
-            "text": text,
-            "bbox": bbox,
-            "indentation_level": indentation_level,
-            "avg_font_size": avg_font_size,
-            "dominant_font_name": dominant_font_name,
-            "is_bold": is_bold_block,
-            "is_italic": is_italic_block,
-            "span_count": total_spans,
-            "raw_spans": [
-                {
-                    "text": span["text"],
-                    "font_size": span["font_size"],
-                    "font_name": span["font_name"],
-                    "font_props": parse_font_flags(span["font_flags"])
-                }
-                for line in raw_block_data["lines"]
-                for span in line["spans"]
-                if span["text"].strip()
-            ]
-        }
+        span_fields = (
+            (span["text"], span["font_size"], span["font_name"], span["font_flags"])
+            for line in raw_block_data["lines"] for span in line["spans"]
+        )
+        return _aggregate_block_spans(span_fields, raw_block_data["block_bbox"])
     
     except Exception as e:
         logger.error(f"Error normalizing text block: {e}")
         return None
 
 
+def iter_page_text_blocks(page: fitz.Page, page_number: int,
+                          include_spans: bool = True) -> Iterator[Dict]:
+    """
+    Yield normalized text blocks from a page one at a time.
+    
+    Same result as extract_raw_page_data followed by normalize_text_block_info,
+    but spans are read straight from PyMuPDF's text dictionary without building
+    the intermediate raw block tree. An error is logged and ends the page early.
+    
+    Args:
+        page: PyMuPDF page object
+        page_number: Page number (1-indexed)
+        include_spans: Whether to keep the per-span raw_spans list
+    
+    Yields:
+        Normalized TextBlock dictionaries
+    """
+    try:
+        for block in page.get_text("dict", flags=TEXT_DICT_FLAGS)["blocks"]:
+            if "lines" not in block:  # Image block
+                continue
+            
+            span_fields = (
+                (span.get("text", ""), span.get("size", 10.0),
+                 span.get("font", ""), span.get("flags", 0))
+                for line in block["lines"] for span in line["spans"]
+            )
+            block_info = _aggregate_block_spans(span_fields, block["bbox"], include_spans)
+            if block_info is None:
+                continue
+            
+            block_info["page_number"] = page_number
+            yield block_info
+    
+    except Exception as e:
+        logger.error(f"Error extracting text blocks from page {page_number}: {e}")
+
+
 def extract_page_text_blocks(page: fitz.Page, page_number: int) -> List[Dict]:
     """
     Extract normalized text blocks from a page for hierarchical parsing.
@@ -172,19 +229,72 @@ def extract_page_text_blocks(page: fitz.Page, page_number: int) -> List[Dict]:
     Returns:
         List of normalized TextBlock dictionaries
     """
+    normalized_blocks = list(iter_page_text_blocks(page, page_number))
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Extracted {len(normalized_blocks)} normalized blocks from page {page_number}")
+    return normalized_blocks
+
+
+def _extract_page_range_blocks(pdf_path: str, start: int, end: int) -> List[List[Dict]]:
+    """
+    Extract normalized text blocks for pages [start, end) in a worker process.
+    
+    PyMuPDF documents cannot be shared across threads or pickled, so each
+    worker opens its own copy. raw_spans is left out, which roughly halves
+    the data pickled back to the parent.
+    """
+    doc = fitz.open(pdf_path)
     try:
-        raw_blocks = extract_raw_page_data(page)
-        normalized_blocks = []
-        
-        for raw_block in raw_blocks:
-            normalized_block = normalize_text_block_info(raw_block)
-            if normalized_block:
-                normalized_block["page_number"] = page_number
-                normalized_blocks.append(normalized_block)
+        return [list(iter_page_text_blocks(doc[page_num], page_num + 1, include_spans=False))
+                for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+
+def iter_document_text_blocks(doc: fitz.Document, pdf_path: Optional[str] = None) -> Iterator[Iterable[Dict]]:
+    """
+    Yield the normalized text blocks of each page, in page order.
+    
+    Documents of at least PARALLEL_EXTRACTION_MIN_PAGES pages are extracted by
+    worker processes when pdf_path is given. Their blocks have no raw_spans.
+    
+    Args:
+        doc: Open PyMuPDF document
+        pdf_path: Path the document was opened from, needed by the workers
         
-        logger.debug(f"Extracted {len(normalized_blocks)} normalized blocks from page {page_number}")
-        return normalized_blocks
+    Yields:
+        Normalized TextBlock dictionaries for one page
+    """
+    page_count = doc.page_count
+    workers = min(available_workers(), -(-page_count // PARALLEL_EXTRACTION_CHUNK_PAGES))
+    next_page = 0
     
-    except Exception as e:
-        logger.error(f"Error extracting text blocks from page {page_number}: {e}")
-        return [] 
\ No newline at end of file
+    if pdf_path and workers > 1 and page_count >= PARALLEL_EXTRACTION_MIN_PAGES:
+        page_ranges = iter([(start, min(start + PARALLEL_EXTRACTION_CHUNK_PAGES, page_count))
+                            for start in range(0, page_count, PARALLEL_EXTRACTION_CHUNK_PAGES)])
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Keep two chunks per worker in flight: workers stay busy while
+                # extracted pages are handed on as soon as their chunk is done
+                pending = deque(executor.submit(_extract_page_range_blocks, pdf_path, start, end)
+                                for start, end in islice(page_ranges, workers * 2))
+                
+                # Yield in submission order to keep pages in order
+                while pending:
+                    chunk_blocks = pending.popleft().result()
+                    for start, end in islice(page_ranges, 1):
+                        pending.append(executor.submit(_extract_page_range_blocks, pdf_path, start, end))
+                    
+                    for page_blocks in chunk_blocks:
+                        yield page_blocks
+                        next_page += 1
+                        
+        except Exception as e:
+            logger.warning(f"Parallel page extraction failed: {e}, "
+                           f"extracting from page {next_page + 1} sequentially")
+    
+    # Sequential path, also resuming after a failed parallel run; blocks are
+    # produced lazily as the caller consumes each page
+    for page_num in range(next_page, page_count):
+        yield iter_page_text_blocks(doc[page_num], page_num + 1)
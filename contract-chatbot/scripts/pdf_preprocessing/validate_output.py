@@ -3,7 +3,35 @@ Validation script to analyze the quality of processed contract JSON
 """
 import json
 import sys
-from collections import Counter
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_SCALAR_EVENTS = frozenset(("null", "boolean", "integer", "double", "number", "string"))
+
+
+def _stream_sections(f, header: dict):
+    """
+    Yield sections one at a time from an open JSON document
+    
+    Top-level scalar fields (id, title, ...) are recorded into header as they
+    are passed, so header is complete once the generator is exhausted.
+    """
+    builder = None
+    for prefix, event, value in ijson.parse(f):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == "sections.item" and event == "end_map":
+                yield builder.value
+                builder = None
+        elif prefix == "sections.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif event in _SCALAR_EVENTS and prefix and "." not in prefix:
+            header[prefix] = value
+
 
 def analyze_json_output(json_path: str):
     """Analyze the processed JSON file and provide quality metrics"""
@@ -11,84 +39,90 @@ def analyze_json_output(json_path: str):
     print(f"📊 Analyzing: {json_path}")
     print("=" * 50)
     
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    # Tally everything in one pass; with ijson the sections are streamed
+    # rather than loading the whole document
+    # Plain dicts count faster than Counter and still keep first-seen order
+    total_sections = 0
+    type_counter = {}
+    category_counter = {}
+    importance_counter = {}
+    glossary_terms_found = 0
+    sections_with_keywords = 0
+    sections_with_monetary = 0
+    sections_with_deadlines = 0
+    examples = {}
+    
+    with open(json_path, 'rb') as f:
+        if ijson is not None:
+            data = {}
+            sections = _stream_sections(f, data)
+        else:
+            data = json.load(f)
+            sections = data.get('sections', [])
+        
+        for section in sections:
+            total_sections += 1
+            section_type = section.get('type', 'unknown')
+            type_counter[section_type] = type_counter.get(section_type, 0) + 1
+            
+            metadata = section.get('metadata', {})
+            
+            category = metadata.get('category', 'unknown')
+            category_counter[category] = category_counter.get(category, 0) + 1
+            
+            importance = metadata.get('importance', 'unknown')
+            importance_counter[importance] = importance_counter.get(importance, 0) + 1
+            
+            if metadata.get('glossaryTerms'):
+                glossary_terms_found += 1
+            
+            if metadata.get('keywords'):
+                sections_with_keywords += 1
+            
+            if metadata.get('containsMonetaryInfo'):
+                sections_with_monetary += 1
+            
+            if metadata.get('containsDeadlines'):
+                sections_with_deadlines += 1
+            
+            # Keep the first substantial section of each category as an example
+            example_category = metadata.get('category', 'general')
+            if example_category not in examples and len(section.get('content', '')) > 50:
+                examples[example_category] = section
     
     # Basic structure validation
     print(f"✅ Document ID: {data.get('id', 'MISSING')}")
     print(f"✅ Document Title: {data.get('title', 'MISSING')}")
-    print(f"✅ Total Sections: {len(data.get('sections', []))}")
-    
-    sections = data.get('sections', [])
+    print(f"✅ Total Sections: {total_sections}")
     
-    if not sections:
+    if not total_sections:
         print("❌ No sections found!")
         return
     
-    # Analyze section types
-    type_counter = Counter(section.get('type', 'unknown') for section in sections)
     print(f"\n📝 Section Types:")
     for section_type, count in type_counter.items():
         print(f"   {section_type}: {count}")
     
-    # Analyze categories
-    category_counter = Counter()
-    importance_counter = Counter()
-    glossary_terms_found = 0
-    sections_with_keywords = 0
-    sections_with_monetary = 0
-    sections_with_deadlines = 0
-    
-    for section in sections:
-        metadata = section.get('metadata', {})
-        
-        category = metadata.get('category', 'unknown')
-        category_counter[category] += 1
-        
-        importance = metadata.get('importance', 'unknown')
-        importance_counter[importance] += 1
-        
-        if metadata.get('glossaryTerms'):
-            glossary_terms_found += 1
-        
-        if metadata.get('keywords'):
-            sections_with_keywords += 1
-            
-        if metadata.get('containsMonetaryInfo'):
-            sections_with_monetary += 1
-            
-        if metadata.get('containsDeadlines'):
-            sections_with_deadlines += 1
-    
     print(f"\n🏷️ Categories:")
     for category, count in category_counter.items():
-        percentage = (count / len(sections)) * 100
+        percentage = (count / total_sections) * 100
         print(f"   {category}: {count} ({percentage:.1f}%)")
     
     print(f"\n⭐ Importance Levels:")
     for importance, count in importance_counter.items():
-        percentage = (count / len(sections)) * 100
+        percentage = (count / total_sections) * 100
         print(f"   {importance}: {count} ({percentage:.1f}%)")
     
     print(f"\n🔍 Enrichment Quality:")
-    print(f"   Sections with glossary terms: {glossary_terms_found} ({(glossary_terms_found/len(sections)*100):.1f}%)")
-    print(f"   Sections with keywords: {sections_with_keywords} ({(sections_with_keywords/len(sections)*100):.1f}%)")
-    print(f"   Sections with monetary info: {sections_with_monetary} ({(sections_with_monetary/len(sections)*100):.1f}%)")
-    print(f"   Sections with deadlines: {sections_with_deadlines} ({(sections_with_deadlines/len(sections)*100):.1f}%)")
+    print(f"   Sections with glossary terms: {glossary_terms_found} ({(glossary_terms_found/total_sections*100):.1f}%)")
+    print(f"   Sections with keywords: {sections_with_keywords} ({(sections_with_keywords/total_sections*100):.1f}%)")
+    print(f"   Sections with monetary info: {sections_with_monetary} ({(sections_with_monetary/total_sections*100):.1f}%)")
+    print(f"   Sections with deadlines: {sections_with_deadlines} ({(sections_with_deadlines/total_sections*100):.1f}%)")
     
     # Sample some content for manual review
     print(f"\n📋 Sample Sections for Manual Review:")
     print("-" * 40)
     
-    # Find examples of different categories
-    examples = {}
-    for section in sections:
-        metadata = section.get('metadata', {})
-        category = metadata.get('category', 'general')
-        
-        if category not in examples and len(section.get('content', '')) > 50:
-            examples[category] = section
-    
     for category, section in examples.items():
         content = section.get('content', '')[:200] + "..." if len(section.get('content', '')) > 200 else section.get('content', '')
         glossary_terms = section.get('metadata', {}).get('glossaryTerms', [])